@@ -0,0 +1,598 @@
+"""Numba compiled kernels for zipping two triangulations together.
+
+These functions implement the hull merging loop of the Guibas and Stolfi
+algorithm on the raw arrays of a TriangulationEdges object, so that the whole
+merge step runs as compiled code without dispatching on Python objects:
+    px, py : float64 arrays of point coordinates
+    org, dest, sym, onext, oprev : int32 arrays of edge fields
+    deactivate : bool array of edge status
+The edge arrays must have enough spare capacity for the edges created during
+the merge, see TriangulationEdges.reserve(), except for merge_hulls which
+allocates the arrays of the merged triangulation itself. Killed edge pairs are
+kept on the free list described in Edges, whose head 'free_head' is passed in
+and returned by the kernels which modify it. The candidate searches and the
+choice between them are inlined into zip_hulls, so the whole loop compiles to
+a single function.
+
+For debugging, set the environment variable NUMBA_DISABLE_JIT=1 to run these
+kernels as pure Python. They also run as pure Python if Numba is not
+installed, see _numba_compat.
+"""
+
+import numpy as np
+
+import paralleldelaunay.triangulation_core.linear_algebra as linalg
+from paralleldelaunay.triangulation_core._numba_compat import njit
+from paralleldelaunay.triangulation_core.edge_topology import (
+    EDGES_PER_POINT,
+    INDEX_DTYPE,
+)
+
+# ----------------------------- Quad-edge operators ---------------------------
+
+
+@njit(cache=True)
+def splice(onext, oprev, edge1, edge2):
+    """Update the next and previous ccw edges of two edges.
+
+    Compiled version of Edges.splice.
+
+    Parameters
+    ----------
+    onext, oprev : numpy.ndarray
+        The onext and oprev edge arrays.
+    edge1, edge2 : int
+        Indices of the edges to splice.
+    """
+    onext_1 = onext[edge1]
+    onext_2 = onext[edge2]
+    oprev[onext_1] = edge2
+    oprev[onext_2] = edge1
+    onext[edge1] = onext_2
+    onext[edge2] = onext_1
+
+
+@njit(cache=True)
+def connect(
+    org,
+    dest,
+    sym,
+    onext,
+    oprev,
+    deactivate,
+    num_edges,
+    free_head,
+    edge1,
+    edge2,
+):
+    """Create a new edge connecting two separated edges.
+
+    Compiled version of Edges.connect. The new edge pair is taken from the
+    free list if it is not empty.
+
+    Parameters
+    ----------
+    org, dest, sym, onext, oprev, deactivate : numpy.ndarray
+        The edge arrays.
+    num_edges : int
+        The number of edge slots in use.
+    free_head : int
+        Head of the free list.
+    edge1, edge2 : int
+        The new edge connects the destination of 'edge1' to the origin of
+        'edge2'.
+
+    Returns
+    -------
+    edge : int
+        Index of the created edge.
+    num_edges : int
+        The updated number of edge slots in use.
+    free_head : int
+        The updated head of the free list.
+    """
+    if free_head == -1:
+        edge = num_edges
+        num_edges += 2
+    else:
+        edge = free_head
+        free_head = onext[free_head]
+    edge_sym = edge + 1
+
+    org[edge] = dest[edge1]
+    dest[edge] = org[edge2]
+    sym[edge] = edge_sym
+    onext[edge] = edge
+    oprev[edge] = edge
+    deactivate[edge] = False
+
+    org[edge_sym] = org[edge2]
+    dest[edge_sym] = dest[edge1]
+    sym[edge_sym] = edge
+    onext[edge_sym] = edge_sym
+    oprev[edge_sym] = edge_sym
+    deactivate[edge_sym] = False
+
+    splice(onext, oprev, edge, oprev[sym[edge1]])
+    splice(onext, oprev, edge_sym, edge2)
+    return edge, num_edges, free_head
+
+
+@njit(cache=True)
+def kill_edge(sym, onext, oprev, deactivate, free_head, e):
+    """Remove an edge and its symmetric edge from the triangulation.
+
+    Compiled version of Edges.kill_edge.
+
+    Parameters
+    ----------
+    sym, onext, oprev, deactivate : numpy.ndarray
+        The edge arrays.
+    free_head : int
+        Head of the free list.
+    e : int
+        Edge to remove from the triangulation.
+
+    Returns
+    -------
+    int
+        The updated head of the free list.
+    """
+    e_sym = sym[e]
+    splice(onext, oprev, e, oprev[e])
+    splice(onext, oprev, e_sym, oprev[e_sym])
+    deactivate[e] = True
+    deactivate[e_sym] = True
+
+    pair = min(e, e_sym)
+    onext[pair] = free_head
+    return pair
+
+
+# ----------------------------- Candidate selection ---------------------------
+
+
+@njit(cache=True, inline="always")
+def rcand_func(
+    px, py, org, dest, sym, onext, oprev, deactivate, free_head, base
+):
+    """Search the right hull for the candidate edge.
+
+    Starting from the edge following the base edge around its destination,
+    candidate edges which fail the in-circle test are deleted from the
+    triangulation until a valid candidate is found.
+
+    Parameters
+    ----------
+    px, py : numpy.ndarray
+        The point coordinates.
+    org, dest, sym, onext, oprev, deactivate : numpy.ndarray
+        The edge arrays.
+    free_head : int
+        Head of the free list.
+    base : int
+        Index of the base edge.
+
+    Returns
+    -------
+    rcand : int
+        Index of the valid right candidate edge, or -1 if the first candidate
+        is not above the base edge.
+    free_head : int
+        The updated head of the free list.
+    """
+    b1, b2 = org[base], dest[base]
+    b1x, b1y, b2x, b2y = px[b1], py[b1], px[b2], py[b2]
+    rcand = onext[sym[base]]
+    cur = dest[rcand]
+    if not linalg.on_right(b1x, b1y, b2x, b2y, px[cur], py[cur]):
+        return -1, free_head
+    while True:
+        nxt = dest[onext[rcand]]
+        cur = dest[rcand]
+        ccw_test = linalg.on_right(b1x, b1y, b2x, b2y, px[nxt], py[nxt])
+        if not ccw_test or not linalg.in_circle(
+            b2x, b2y, b1x, b1y, px[cur], py[cur], px[nxt], py[nxt]
+        ):
+            return rcand, free_head
+        t = onext[rcand]
+        free_head = kill_edge(sym, onext, oprev, deactivate, free_head, rcand)
+        rcand = t
+
+
+@njit(cache=True, inline="always")
+def lcand_func(
+    px, py, org, dest, sym, onext, oprev, deactivate, free_head, base
+):
+    """Search the left hull for the candidate edge, similar to rcand_func."""
+    b1, b2 = org[base], dest[base]
+    b1x, b1y, b2x, b2y = px[b1], py[b1], px[b2], py[b2]
+    lcand = oprev[base]
+    cur = dest[lcand]
+    if not linalg.on_right(b1x, b1y, b2x, b2y, px[cur], py[cur]):
+        return -1, free_head
+    while True:
+        nxt = dest[oprev[lcand]]
+        cur = dest[lcand]
+        ccw_test = linalg.on_right(b1x, b1y, b2x, b2y, px[nxt], py[nxt])
+        if not ccw_test or not linalg.in_circle(
+            b2x, b2y, b1x, b1y, px[cur], py[cur], px[nxt], py[nxt]
+        ):
+            return lcand, free_head
+        t = oprev[lcand]
+        free_head = kill_edge(sym, onext, oprev, deactivate, free_head, lcand)
+        lcand = t
+
+
+@njit(cache=True, inline="always")
+def candidate_sign(px, py, org, dest, rcand, lcand):
+    """Compare the two valid candidate edges.
+
+    Parameters
+    ----------
+    px, py : numpy.ndarray
+        The point coordinates.
+    org, dest : numpy.ndarray
+        The edge arrays.
+    rcand : int
+        Index of right candidate edge.
+    lcand : int
+        Index of left candidate edge.
+
+    Returns
+    -------
+    numpy.int8
+        1 if the left candidate should be connected, -1 if the right
+        candidate should be connected and 0 if the four points are
+        cocircular, in which case either choice is valid.
+    """
+    p1, p2 = dest[rcand], org[rcand]
+    p3, p4 = org[lcand], dest[lcand]
+    return linalg.in_circle_sign(
+        px[p1], py[p1], px[p2], py[p2], px[p3], py[p3], px[p4], py[p4]
+    )
+
+
+@njit(cache=True, inline="always")
+def select_candidate(
+    px, py, org, dest, sym, onext, oprev, deactivate, free_head, base
+):
+    """Find the edges to connect to create the next base edge.
+
+    Both hulls are searched for their candidate edge and the in-circle sign
+    of the two candidates chooses between them.
+
+    Parameters
+    ----------
+    px, py : numpy.ndarray
+        The point coordinates.
+    org, dest, sym, onext, oprev, deactivate : numpy.ndarray
+        The edge arrays.
+    free_head : int
+        Head of the free list.
+    base : int
+        Index of the current base edge.
+
+    Returns
+    -------
+    edge1, edge2 : int
+        The next base edge connects the destination of 'edge1' to the origin
+        of 'edge2'. Both are -1 if neither candidate is valid, in which case
+        the hull merge is complete.
+    free_head : int
+        The updated head of the free list.
+    """
+    rcand, free_head = rcand_func(
+        px, py, org, dest, sym, onext, oprev, deactivate, free_head, base
+    )
+    lcand, free_head = lcand_func(
+        px, py, org, dest, sym, onext, oprev, deactivate, free_head, base
+    )
+
+    # Bit 1 is set if the right candidate is valid, bit 0 if the left
+    # candidate is valid
+    valid = (int(rcand >= 0) << 1) | int(lcand >= 0)
+    if valid == 0:
+        return -1, -1, free_head
+    if valid == 3:
+        connect_left = candidate_sign(px, py, org, dest, rcand, lcand) > 0
+    else:
+        connect_left = valid == 1
+    if connect_left:
+        return lcand, sym[base], free_head
+    return sym[base], sym[rcand], free_head
+
+
+# ------------------------------- Tangent search ------------------------------
+
+
+@njit(cache=True)
+def lowest_common_tangent(
+    l_px,
+    l_py,
+    l_org,
+    l_dest,
+    l_sym,
+    l_onext,
+    left_e,
+    r_px,
+    r_py,
+    r_org,
+    r_dest,
+    r_sym,
+    r_oprev,
+    right_e,
+):
+    """Find lowest y-value tangential edge connecting two triangulations.
+
+    Compiled version of triangulation.lowest_common_tangent, working on the
+    arrays of the two separate triangulations.
+
+    Parameters
+    ----------
+    l_px, l_py, l_org, l_dest, l_sym, l_onext : numpy.ndarray
+        The point and edge arrays of the left triangulation.
+    left_e : int
+        The outer edge of the left triangulation.
+    r_px, r_py, r_org, r_dest, r_sym, r_oprev : numpy.ndarray
+        The point and edge arrays of the right triangulation.
+    right_e : int
+        The inner edge of the right triangulation.
+
+    Returns
+    -------
+    left_e : int
+        The index of the edge in the left hull which forms one end of the base
+        edge.
+    right_e : int
+        The index of the edge in the right hull which forms the other end of
+        the base edge.
+    """
+    p1, p2 = l_org[left_e], l_dest[left_e]
+    p4, p5 = r_org[right_e], r_dest[right_e]
+
+    while True:
+        if linalg.on_right(
+            l_px[p1], l_py[p1], l_px[p2], l_py[p2], r_px[p4], r_py[p4]
+        ):
+            left_e = l_onext[l_sym[left_e]]
+            p1, p2 = l_org[left_e], l_dest[left_e]
+
+        elif linalg.on_left(
+            r_px[p4], r_py[p4], r_px[p5], r_py[p5], l_px[p1], l_py[p1]
+        ):
+            right_e = r_oprev[r_sym[right_e]]
+            p4, p5 = r_org[right_e], r_dest[right_e]
+
+        else:
+            return left_e, right_e
+
+
+# ------------------------------- Merge kernel --------------------------------
+
+
+@njit(cache=True)
+def combine_hulls(left, l_num_edges, right, r_num_edges):
+    """Combine the points and edges of two triangulations.
+
+    The indices of the right triangulation are shifted as its edges are
+    copied after those of the left triangulation, whose indices are kept.
+
+    Parameters
+    ----------
+    left, right : tuple of numpy.ndarray
+        The arrays px, py, org, dest, sym, onext, oprev and deactivate of the
+        left and right triangulations.
+    l_num_edges, r_num_edges : int
+        The number of edge slots in use in each triangulation.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        The arrays of the combined triangulation, in the same order, with
+        room for the edges created by the merge.
+    """
+    l_px, l_py, l_org, l_dest, l_sym, l_onext, l_oprev, l_deactivate = left
+    r_px, r_py, r_org, r_dest, r_sym, r_onext, r_oprev, r_deactivate = right
+    shift_p = len(l_px)
+    shift_e = l_num_edges
+    px = np.concatenate((l_px, r_px))
+    py = np.concatenate((l_py, r_py))
+    capacity = max(EDGES_PER_POINT * len(px), l_num_edges + r_num_edges)
+    org = np.empty(capacity, dtype=INDEX_DTYPE)
+    dest = np.empty(capacity, dtype=INDEX_DTYPE)
+    sym = np.empty(capacity, dtype=INDEX_DTYPE)
+    onext = np.empty(capacity, dtype=INDEX_DTYPE)
+    oprev = np.empty(capacity, dtype=INDEX_DTYPE)
+    deactivate = np.empty(capacity, dtype=np.bool_)
+    for e in range(l_num_edges):
+        org[e] = l_org[e]
+        dest[e] = l_dest[e]
+        sym[e] = l_sym[e]
+        onext[e] = l_onext[e]
+        oprev[e] = l_oprev[e]
+        deactivate[e] = l_deactivate[e]
+    for e in range(r_num_edges):
+        org[shift_e + e] = r_org[e] + shift_p
+        dest[shift_e + e] = r_dest[e] + shift_p
+        sym[shift_e + e] = r_sym[e] + shift_e
+        onext[shift_e + e] = r_onext[e] + shift_e
+        oprev[shift_e + e] = r_oprev[e] + shift_e
+        deactivate[shift_e + e] = r_deactivate[e]
+    return px, py, org, dest, sym, onext, oprev, deactivate
+
+
+@njit(cache=True)
+def rebuild_free_list(onext, deactivate, num_edges):
+    """Rebuild the free list from the killed edge pairs, in increasing order.
+
+    Compiled version of Edges.rebuild_free_list.
+
+    Parameters
+    ----------
+    onext, deactivate : numpy.ndarray
+        The edge arrays.
+    num_edges : int
+        The number of edge slots in use.
+
+    Returns
+    -------
+    int
+        The head of the free list.
+    """
+    free_head = -1
+    for e in range(num_edges - 2, -1, -2):
+        if deactivate[e]:
+            onext[e] = free_head
+            free_head = e
+    return free_head
+
+
+@njit(cache=True)
+def zip_hulls(
+    px,
+    py,
+    org,
+    dest,
+    sym,
+    onext,
+    oprev,
+    deactivate,
+    num_edges,
+    free_head,
+    base,
+):
+    """Zip together two separate hulls' triangulations.
+
+    Compiled version of triangulation.zip_hulls.
+
+    Parameters
+    ----------
+    px, py : numpy.ndarray
+        The point coordinates.
+    org, dest, sym, onext, oprev, deactivate : numpy.ndarray
+        The edge arrays.
+    num_edges : int
+        The number of edge slots in use.
+    free_head : int
+        Head of the free list.
+    base : int
+        Index of base edge.
+
+    Returns
+    -------
+    num_edges : int
+        The updated number of edge slots in use.
+    free_head : int
+        The updated head of the free list.
+    """
+    while True:
+        edge1, edge2, free_head = select_candidate(
+            px, py, org, dest, sym, onext, oprev, deactivate, free_head, base
+        )
+        if edge1 == -1:
+            return num_edges, free_head
+        base, num_edges, free_head = connect(
+            org,
+            dest,
+            sym,
+            onext,
+            oprev,
+            deactivate,
+            num_edges,
+            free_head,
+            edge1,
+            edge2,
+        )
+
+
+@njit(cache=True, nogil=True)
+def merge_hulls(
+    l_px,
+    l_py,
+    l_org,
+    l_dest,
+    l_sym,
+    l_onext,
+    l_oprev,
+    l_deactivate,
+    l_num_edges,
+    l_inner,
+    l_outer,
+    r_px,
+    r_py,
+    r_org,
+    r_dest,
+    r_sym,
+    r_onext,
+    r_oprev,
+    r_deactivate,
+    r_num_edges,
+    r_inner,
+    r_outer,
+):
+    """Merge two adjacent triangulations into a single triangulation.
+
+    Compiled version of the complete merge of a pair of triangulations, see
+    triangulation.merge_pair. The tangent search, combine_hulls, the base
+    edge and zip_hulls run in a single call. The two input triangulations
+    are not modified. The kernel releases the GIL, so independent pairs can
+    be merged by several threads at once.
+
+    Parameters
+    ----------
+    l_px, l_py, l_org, l_dest, l_sym, l_onext, l_oprev, l_deactivate : ndarray
+        The point and edge arrays of the left triangulation.
+    l_num_edges, l_inner, l_outer : int
+        The number of edge slots in use and the extreme edges of the left
+        triangulation.
+    r_px, r_py, r_org, r_dest, r_sym, r_onext, r_oprev, r_deactivate : ndarray
+        The point and edge arrays of the right triangulation.
+    r_num_edges, r_inner, r_outer : int
+        The number of edge slots in use and the extreme edges of the right
+        triangulation.
+
+    Returns
+    -------
+    px, py, org, dest, sym, onext, oprev, deactivate : numpy.ndarray
+        The point and edge arrays of the merged triangulation.
+    num_edges, free_head : int
+        The number of edge slots in use and the head of the free list.
+    inner, outer : int
+        The extreme edges of the merged triangulation.
+    """
+    ldi, rdi = lowest_common_tangent(
+        l_px,
+        l_py,
+        l_org,
+        l_dest,
+        l_sym,
+        l_onext,
+        l_outer,
+        r_px,
+        r_py,
+        r_org,
+        r_dest,
+        r_sym,
+        r_oprev,
+        r_inner,
+    )
+    left = (l_px, l_py, l_org, l_dest, l_sym, l_onext, l_oprev, l_deactivate)
+    right = (r_px, r_py, r_org, r_dest, r_sym, r_onext, r_oprev, r_deactivate)
+    edges = combine_hulls(left, l_num_edges, right, r_num_edges)
+    org, sym, onext, deactivate = edges[2], edges[4], edges[5], edges[7]
+    num_edges = l_num_edges + r_num_edges
+    free_head = rebuild_free_list(onext, deactivate, num_edges)
+
+    # Connect the base edge and correct the extreme edges
+    ldo, rdi, rdo = l_inner, rdi + l_num_edges, r_outer + l_num_edges
+    base, num_edges, free_head = connect(
+        *edges[2:], num_edges, free_head, sym[ldi], rdi
+    )
+    if org[ldi] == org[ldo]:
+        ldo = base
+    if org[rdi] == org[rdo]:
+        rdo = sym[base]
+
+    num_edges, free_head = zip_hulls(*edges, num_edges, free_head, base)
+    return edges + (num_edges, free_head, ldo, rdo)
@@ -0,0 +1,39 @@
+"""Access to the Numba compiler, with a pure Python fallback.
+
+The compiled kernels import 'njit' and 'prange' from this module. If Numba
+cannot be imported, 'njit' returns the decorated function unchanged and
+'prange' is the builtin 'range', so the kernels run as pure Python, the same
+as with the environment variable NUMBA_DISABLE_JIT=1. The number of threads
+of the parallel kernels is set with 'set_num_threads', which does nothing
+without Numba.
+"""
+
+try:
+    import numba
+    from numba import njit, prange
+except ImportError:  # pragma: no cover
+    numba = None
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Return the decorated function unchanged, Numba is not available."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
+
+
+def set_num_threads(num):
+    """Set the number of threads used by the parallel kernels.
+
+    Parameters
+    ----------
+    num : int
+        The number of threads. It is capped at the size of Numba's thread
+        pool, set by the environment variable NUMBA_NUM_THREADS.
+    """
+    if numba is not None:
+        numba.set_num_threads(max(1, min(num, numba.config.NUMBA_NUM_THREADS)))
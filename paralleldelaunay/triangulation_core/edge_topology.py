@@ -1,188 +1,188 @@
 """Implementation of the quad-edge data structure used by Gubias and Stolfi."""
 
+import numpy as np
 
-from paralleldelaunay.triangulation_core.linear_algebra import list_equal
+from paralleldelaunay.triangulation_core._numba_compat import njit
 
-# --------------------------------- Edge class --------------------------------
+INDEX_DTYPE = np.int32
 
+# Upper bound on the number of directed edges per point of a triangulation, a
+# planar subdivision of n points has at most 3n - 6 edges
+EDGES_PER_POINT = 6
 
-class Edge:
-    """Representation of a single quad-edge.
+# -------------------------------- Edges class --------------------------------
+
+
+class Edges:
+    """Represent a set of edges in a triangulation.
+
+    Stores methods to add edges and keep track of the number of edges, as well
+    as methods to set the inner and outer edges used to construct triangle
+    primitives.
 
     In the Gubias and Stolfi algorithm, an edge is represented as a directed
     edge (d-edge) which consists of two half-edges. Each half-edge represents
     one side of the edge and has pointers to its origin vertex, its target
     vertex, the next half-edge in the counterclockwise direction around its
-    origin, and the opposite half-edge. Each d-edge is represented by four
-    half-edges, which are organized into a "quad-edge".
+    origin, and the opposite half-edge.
+
+    The edges are stored as a structure of arrays: the fields of edge 'e' are
+    'org[e]', 'dest[e]', 'sym[e]', 'onext[e]', 'oprev[e]' and 'deactivate[e]'.
+    Only the first 'num_edges' entries of each array are in use, the arrays
+    are grown geometrically if they run out of capacity.
+
+    Edges are always created in pairs (e, sym[e]) occupying the slots 2k and
+    2k+1. When a pair is killed its slots are pushed onto a free list, which
+    is threaded through the 'onext' field of the even slot, and new pairs are
+    taken from the free list before the arrays are extended.
 
     Attributes
     ----------
-    index : int
-        Unique edge index.
-    org : int
-        Index of edge origin point..
-    dest : int
-        Index of edge destination point.
-    sym : int
-        Index of symmetric edge.
-    onext : int
-        Index of next ccw edge connected to the origin point.
-    oprev : int
-        Index of previous ccw edge connected to the origin point.
-    deactivate : bool
-        Status of edge in triangulation. False if the edge is still part of the
-        triangulation.
+    org : numpy.ndarray
+        Index of the origin point of each edge.
+    dest : numpy.ndarray
+        Index of the destination point of each edge.
+    sym : numpy.ndarray
+        Index of the symmetric edge of each edge.
+    onext : numpy.ndarray
+        Index of next ccw edge connected to the origin point of each edge.
+    oprev : numpy.ndarray
+        Index of previous ccw edge connected to the origin point of each edge.
+    deactivate : numpy.ndarray
+        Status of each edge in triangulation. False if the edge is still part
+        of the triangulation.
+    num_edges : int
+        The number of edge slots in use, including deactivated edges.
+    free_head : int
+        Index of the first edge pair on the free list, or -1 if it is empty.
     """
 
-    def __init__(self, idx, org, dst, s, onxt, oprv):
-        self.index = idx
-        self.org = org
-        self.dest = dst
-        self.sym = s
-        self.onext = onxt
-        self.oprev = oprv
-        self.deactivate = False
-
-    def __repr__(self):
-        """Return a string representation of the quad-edge object.
+    _index_fields = ("org", "dest", "sym", "onext", "oprev")
 
-        Returns
-        -------
-        str
-            A string representation of the quad-edge object.
-        """
-        return (
-            f"[{self.index}, {self.org}, "
-            f"{self.dest}, {self.sym}, "
-            f"{self.onext}, {self.oprev}, "
-            f"{self.deactivate}]"
-        )
-
-    def return_point(self):
-        """Get the edge origin and destination as a list.
+    def __init__(self, capacity=0):
+        self.org = np.empty(capacity, dtype=INDEX_DTYPE)
+        self.dest = np.empty(capacity, dtype=INDEX_DTYPE)
+        self.sym = np.empty(capacity, dtype=INDEX_DTYPE)
+        self.onext = np.empty(capacity, dtype=INDEX_DTYPE)
+        self.oprev = np.empty(capacity, dtype=INDEX_DTYPE)
+        self.deactivate = np.empty(capacity, dtype=np.bool_)
+        self.num_edges = 0
+        self.free_head = -1
+        self.inner = None
+        self.outer = None
 
-        Returns
-        -------
-        list
-            Origin and destination as a list.
-        """
-        return [self.org, self.dest]
+    @property
+    def capacity(self):
+        """int: The number of edges which fit in the allocated arrays."""
+        return len(self.org)
 
-    def shift_indices(self, shift_edges, shift_points):
-        """Shift the indices of an edge.
+    def __getstate__(self):
+        """Return the state for pickling, without the unused edge slots."""
+        state = self.__dict__.copy()
+        for field in self._index_fields + ("deactivate",):
+            state[field] = state[field][: self.num_edges]
+        return state
 
-        This is used when merging sets of edges to ensure each edge has a
-        unique index.
+    def reserve(self, capacity):
+        """Grow the edge arrays so that they can hold 'capacity' edges.
 
         Parameters
         ----------
-        shift_edges : int
-            Integer to shift edge indices by.
-        shift_points : int
-            Integer to shift origin and destination points by.
+        capacity : int
+            The minimum number of edges the arrays must be able to hold.
         """
-        self.index += shift_edges
-        self.org += shift_points
-        self.dest += shift_points
-        self.sym += shift_edges
-        self.onext += shift_edges
-        self.oprev += shift_edges
-
-    def find_connections(self, edges):
-        """Find edges connected to the origin point.
+        if capacity <= self.capacity:
+            return
+        for field in self._index_fields + ("deactivate",):
+            old = getattr(self, field)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[: self.num_edges] = old[: self.num_edges]
+            setattr(self, field, new)
 
-        Find all the edges in the triangulation connected to the origin point
-        of this edge. This gives a list of the points that the boid is to
-        consider as neighbours.
+    def push_back_pair(self, origin, dest):
+        """Write a new pair of edges connecting two points into the arrays.
+
+        The pair is stored in the slots given by 'new_edge_index', which are
+        either at the end of the arrays or taken from the free list. Each new
+        edge is its own next and previous ccw edge.
 
         Parameters
         ----------
-        unique_edges : list of Edge class objects
-            The list of unique edges in the triangulation.
+        origin : int
+            Index of origin point.
+        dest : int
+            Index of destination point.
 
         Returns
         -------
-        pts_subset : list
-            List of the neighbour points.
+        edge : int
+            Index of the edge connecting origin to dest.
+        edge_sym : int
+            Index of the edge connecting dest to origin.
         """
-        pts_subset = [self.return_point()]
-        next_edge = edges[self.onext]
-
-        while not list_equal(next_edge.return_point(), self.return_point()):
-            pts_subset.append(next_edge.return_point())
-            next_edge = edges[next_edge.onext]
-        return pts_subset
-
+        idx = self.new_edge_index()
+        idx_sym = idx + 1
+        if idx_sym >= self.capacity:
+            # Grow geometrically, so repeated appends only reallocate a
+            # logarithmic number of times
+            self.reserve(max(8, idx_sym + 1, 2 * self.capacity))
+        self.org[idx] = origin
+        self.dest[idx] = dest
+        self.sym[idx] = idx_sym
+        self.onext[idx] = idx
+        self.oprev[idx] = idx
+        self.deactivate[idx] = False
+        self.org[idx_sym] = dest
+        self.dest[idx_sym] = origin
+        self.sym[idx_sym] = idx
+        self.onext[idx_sym] = idx_sym
+        self.oprev[idx_sym] = idx_sym
+        self.deactivate[idx_sym] = False
+        self.num_edges = max(self.num_edges, idx_sym + 1)
+        return idx, idx_sym
+
+    def new_edge_index(self):
+        """Return the index for a new pair of edges.
+
+        Slots of killed edges are reused first, otherwise the new pair is
+        placed at the end of the edge arrays.
 
-def setup_edge(origin, dest, edge_idx):
-    """Create symmetric edge for two points.
-
-    This function takes in the index of two points and creates an edge array,
-    as well as an edge for the symmetric edge.
-
-    Parameters
-    ----------
-    origin : int
-        Index of origin point.
-    dest : int
-        Index of destination point.
-    edge_idx : int
-        The index of the new edge.
-
-    Returns
-    -------
-    edge : Edge class
-        Edge connecting org to dest.
-    edge_sym : Edge class
-        Edge connecting dest to org.
-    """
-    e1_idx = edge_idx
-    e2_idx = edge_idx + 1
-
-    edge = Edge(e1_idx, origin, dest, e2_idx, e1_idx, e1_idx)
-    edge_sym = Edge(e2_idx, dest, origin, e1_idx, e2_idx, e2_idx)
-
-    return edge, edge_sym
-
-
-# -------------------------------- Edges class --------------------------------
-
-
-class Edges:
-    """Represent a set of edges in a triangulation.
-
-    Stores methods to add edges and keep track of the number of edges, as well
-    as methods to set the inner and outer edges used to construct triangle
-    primitives.
-    """
-
-    def __init__(self):
-        self.edges = []
-        self.num_edges = 0
-        self.inner = None
-        self.outer = None
+        Returns
+        -------
+        int
+            Index of the first edge of the new pair, the symmetric edge takes
+            the following index.
+        """
+        if self.free_head == -1:
+            return self.num_edges
+        idx = self.free_head
+        self.free_head = int(self.onext[idx])
+        return idx
 
-    def push_back(self, new_edge):
-        """Append a new edge to the end of the list of edges.
+    def return_point(self, e):
+        """Get the origin and destination of an edge as a list.
 
         Parameters
         ----------
-        new_edge : Edge
-            The new 'Edge' object to be added to the end of the list of edges.
+        e : int
+            Index of the edge.
+
+        Returns
+        -------
+        list
+            Origin and destination as a list.
         """
-        self.edges.append(new_edge)
-        self.num_edges += 1
+        return [int(self.org[e]), int(self.dest[e])]
 
     def set_extreme_edges(self, left_most_edge, right_most_edge):
         """Set the inner and outer edges for constructing primitives.
 
         Parameters
         ----------
-        left_most_edge : Edge
+        left_most_edge : int
             The left-most edge in the triangulation, which will be used as the
             inner edge.
-        right_most_edge : Edge
+        right_most_edge : int
             The right-most edge in the triangulation, which will be used as the
             outer edge.
         """
@@ -198,63 +198,146 @@ class Edges:
 
         Parameters
         ----------
-        edge1 : Edge class
-        edge2 : Edge class
+        edge1 : int
+        edge2 : int
         """
-        self.edges[self.edges[edge1].onext].oprev = edge2
-        self.edges[self.edges[edge2].onext].oprev = edge1
-        onext_2 = self.edges[edge2].onext
-        onext_1 = self.edges[edge1].onext
-        self.edges[edge1].onext = onext_2
-        self.edges[edge2].onext = onext_1
+        onext, oprev = self.onext, self.oprev
+        onext_1 = onext[edge1]
+        onext_2 = onext[edge2]
+        oprev[onext_1] = edge2
+        oprev[onext_2] = edge1
+        onext[edge1] = onext_2
+        onext[edge2] = onext_1
 
     def connect(self, edge1, edge2):
         """Take two separated edges and creates a new edge connecting the two.
 
         Parameters
         ----------
-        edge1 : Edge class
-        edge2 : Edge class
+        edge1 : int
+        edge2 : int
 
         Returns
         -------
         out : int
             Index of the created edge.
         """
-        current_index = self.num_edges
-        edge, edge_sym = setup_edge(
-            self.edges[edge1].dest, self.edges[edge2].org, current_index
-        )
-        self.push_back(edge)
-        self.push_back(edge_sym)
-        edge1_sym_oprev = self.edges[self.edges[edge1].sym].oprev
-        self.splice(edge.index, edge1_sym_oprev)
-        self.splice(self.edges[edge.index].sym, edge2)
-        return edge.index
+        edge, edge_sym = self.push_back_pair(self.dest[edge1], self.org[edge2])
+        edge1_sym_oprev = self.oprev[self.sym[edge1]]
+        self.splice(edge, edge1_sym_oprev)
+        self.splice(edge_sym, edge2)
+        return edge
 
     def kill_edge(self, e):
         """Remove edge, deactivate status, fix connections.
 
         This function removes an edge from the triangulation by setting the
         status of edge.deactivate to True. The function also fixed the
-        connecting edges too.
+        connecting edges too. The slots of the edge pair are pushed onto the
+        free list for reuse.
 
         Parameters
         ----------
-        e : Edge class
+        e : int
             Edge to remove from the triangulation.
         """
+        oprev = self.oprev
+        e_sym = self.sym[e]
+
         # Fix the local triangulation
-        self.splice(e, self.edges[e].oprev)
-        self.splice(self.edges[e].sym, self.edges[self.edges[e].sym].oprev)
+        self.splice(e, oprev[e])
+        self.splice(e_sym, oprev[e_sym])
 
         # Set the status of the edge and it's symmetric edge to kill
-        self.edges[e].deactivate = True
-        self.edges[self.edges[e].sym].deactivate = True
+        self.deactivate[e] = True
+        self.deactivate[e_sym] = True
+
+        pair = min(e, e_sym)
+        self.onext[pair] = self.free_head
+        self.free_head = int(pair)
+
+    def rebuild_free_list(self):
+        """Rebuild the free list from the deactivated edges."""
+        num = self.num_edges
+        dead = np.flatnonzero(self.deactivate[:num])
+        dead = dead[dead < self.sym[dead]]
+        if len(dead) == 0:
+            self.free_head = -1
+            return
+        self.onext[dead[:-1]] = dead[1:]
+        self.onext[dead[-1]] = -1
+        self.free_head = int(dead[0])
 
     def filter_deactivated(self):
-        """Remove deactivated edges from the edges list."""
-        self.edges = [e for e in self.edges if not e.deactivate]
+        """Remove deactivated edges from the edges arrays.
+
+        The remaining edges are compacted to the start of the arrays, keeping
+        their order, and the edge indices stored in 'sym', 'onext', 'oprev'
+        and the extreme edges are remapped to the new positions. Edges are
+        removed in pairs, so the pairs keep occupying the slots 2k and 2k+1.
+        """
+        keep = ~self.deactivate[: self.num_edges]
+        new_index = np.cumsum(keep, dtype=INDEX_DTYPE) - 1
+        self.org = self.org[: self.num_edges][keep]
+        self.dest = self.dest[: self.num_edges][keep]
+        self.sym = new_index[self.sym[: self.num_edges][keep]]
+        self.onext = new_index[self.onext[: self.num_edges][keep]]
+        self.oprev = new_index[self.oprev[: self.num_edges][keep]]
+        self.deactivate = self.deactivate[: self.num_edges][keep]
+        if self.inner is not None:
+            self.inner = int(new_index[self.inner])
+        if self.outer is not None:
+            self.outer = int(new_index[self.outer])
+        self.num_edges = len(self.org)
+        self.free_head = -1
+
+    def find_connections(self, e):
+        """Find edges connected to the origin point.
+
+        Find all the edges in the triangulation connected to the origin point
+        of edge 'e'. This gives a list of the points that the boid is to
+        consider as neighbours.
+
+        Parameters
+        ----------
+        e : int
+            Index of the edge.
+
+        Returns
+        -------
+        pts_subset : list
+            List of the neighbour points.
+        """
+        return [list(edge) for edge in self.iter_neighbours(e)]
+
+    def iter_neighbours(self, e):
+        """Iterate over the edges connected to the origin point.
+
+        Lazy version of find_connections, which walks the ring of edges
+        around the origin of edge 'e' without building a list.
+
+        Parameters
+        ----------
+        e : int
+            Index of the edge.
+
+        Yields
+        ------
+        org : int
+            Index of the origin point, shared by all edges of the ring.
+        dest : int
+            Index of the neighbour point.
+        """
+        org, dest, onext = self.org, self.dest, self.onext
+        next_edge = e
+
+        # The ring of edges around the origin is complete when it returns to
+        # the starting edge
+        while True:
+            yield int(org[next_edge]), int(dest[next_edge])
+            next_edge = onext[next_edge]
+            if next_edge == e:
+                return
 
     def get_unique(self, num):
         """Return a list of unique edges corresponding to each point index.
@@ -262,9 +345,9 @@ class Edges:
         This method returns a list of unique edges, where each edge corresponds
         to a unique point index in the 'Edges' object. The method iterates over
         the edges in the 'Edges' object and checks if the origin vertex of the
-        edge has been seen before. If the origin vertex is unique, the edge is
-        added to the corresponding index in the 'unique' list. The method
-        returns the 'unique' list.
+        edge has been seen before, using an array of flags indexed by point.
+        If the origin vertex is unique, the edge is added to the corresponding
+        index in the 'unique' list. The method returns the 'unique' list.
 
         Parameters
         ----------
@@ -274,30 +357,94 @@ class Edges:
         Returns
         -------
         list
-            A list of unique edges corresponding to each point index.
+            A list of unique edge indices corresponding to each point index.
         """
         unique = [""] * num
-        points_seen = []
-        for edge in self.edges:
-            if edge.org not in points_seen:
-                unique[edge.org] = edge
-                points_seen.append(edge.org)
+        seen = np.zeros(num, dtype=np.bool_)
+        org, deactivate = self.org, self.deactivate
+        for e in range(self.num_edges):
+            if deactivate[e]:
+                continue
+            o = org[e]
+            if not seen[o]:
+                unique[o] = e
+                seen[o] = True
         return unique
 
 
+# ------------------------------ Adjacency kernel -----------------------------
+
+
+@njit(cache=True)
+def _ring_csr(org, dest, onext, deactivate, num_edges, num_points):
+    """Build the CSR adjacency of the points from the onext rings.
+
+    Parameters
+    ----------
+    org, dest, onext, deactivate : numpy.ndarray
+        The edge arrays.
+    num_edges : int
+        The number of edge slots in use.
+    num_points : int
+        The number of points.
+
+    Returns
+    -------
+    indptr : numpy.ndarray
+        The neighbours of point 'v' are 'neighbours[indptr[v]:indptr[v+1]]'.
+    neighbours : numpy.ndarray
+        The neighbouring points of each point, in ccw order around it.
+    """
+    indptr = np.zeros(num_points + 1, dtype=np.int32)
+    for e in range(num_edges):
+        if not deactivate[e]:
+            indptr[org[e] + 1] += 1
+    for v in range(num_points):
+        indptr[v + 1] += indptr[v]
+
+    neighbours = np.empty(indptr[num_points], dtype=np.int32)
+    visited = np.zeros(num_points, dtype=np.bool_)
+    for e in range(num_edges):
+        v = org[e]
+        if deactivate[e] or visited[v]:
+            continue
+        visited[v] = True
+
+        # Walk the ring of edges around the origin once
+        pos = indptr[v]
+        ring = e
+        while True:
+            neighbours[pos] = dest[ring]
+            pos += 1
+            ring = onext[ring]
+            if ring == e:
+                break
+    return indptr, neighbours
+
+
 # ---------------------------- Triangulation class ----------------------------
 
 
 class TriangulationEdges(Edges):
     """A class for storing the edges of a Delaunay triangulation.
 
-    This class inherits from the 'Edges' class and adds a reference to the
-    points of the triangulation. It also includes methods for shifting the
-    indices of the edges and points when merging two triangulations, and for
-    merging the hulls of two triangulations.
+    This class inherits from the 'Edges' class and adds the points of the
+    triangulation. The points are stored as two parallel float64 arrays of x
+    and y coordinates (structure of arrays), so that a point lookup is a pair
+    of contiguous array reads rather than a chase through a list of lists. It
+    also includes methods for shifting the indices of the edges and points
+    when merging two triangulations, and for merging the hulls of two
+    triangulations.
+
+    Attributes
+    ----------
+    px : numpy.ndarray
+        The x-coordinates of the points in the triangulation.
+    py : numpy.ndarray
+        The y-coordinates of the points in the triangulation.
     """
 
-    def __init__(self, points_subset):
+    def __init__(self, points_subset, capacity=None):
         """
         Initialize the TriangulationEdges object.
 
@@ -305,9 +452,134 @@ class TriangulationEdges(Edges):
         ----------
         points_subset : array-like
             An array of points in the triangulation.
+        capacity : int, optional
+            The number of edges to preallocate. Defaults to EDGES_PER_POINT
+            times the number of points, the upper bound on the number of
+            directed edges in a triangulation.
         """
-        super().__init__()
-        self.points = points_subset
+        if capacity is None:
+            capacity = EDGES_PER_POINT * len(points_subset)
+        super().__init__(capacity)
+        points = np.asarray(points_subset, dtype=np.float64).reshape(-1, 2)
+        self.px = np.ascontiguousarray(points[:, 0])
+        self.py = np.ascontiguousarray(points[:, 1])
+
+    @classmethod
+    def from_arrays(
+        cls,
+        px,
+        py,
+        org,
+        dest,
+        sym,
+        onext,
+        oprev,
+        deactivate,
+        num_edges,
+        free_head,
+    ):
+        """Create a TriangulationEdges object from existing arrays.
+
+        The arrays are used directly, without copying.
+
+        Parameters
+        ----------
+        px, py : numpy.ndarray
+            The point coordinates.
+        org, dest, sym, onext, oprev, deactivate : numpy.ndarray
+            The edge arrays.
+        num_edges : int
+            The number of edge slots in use.
+        free_head : int
+            Head of the free list.
+
+        Returns
+        -------
+        TriangulationEdges
+            The triangulation stored in the arrays.
+        """
+        triang = cls.__new__(cls)
+        triang.px, triang.py = px, py
+        triang.org, triang.dest, triang.sym = org, dest, sym
+        triang.onext, triang.oprev = onext, oprev
+        triang.deactivate = deactivate
+        triang.num_edges = int(num_edges)
+        triang.free_head = int(free_head)
+        triang.inner = None
+        triang.outer = None
+        return triang
+
+    @property
+    def num_points(self):
+        """int: The number of points in the triangulation."""
+        return len(self.px)
+
+    @property
+    def points(self):
+        """numpy.ndarray: The points of the triangulation, of shape (N, 2).
+
+        The array is assembled from 'px' and 'py' on each access, so changes
+        to it are not reflected in the triangulation.
+        """
+        return np.column_stack((self.px, self.py))
+
+    def point(self, idx):
+        """Return the coordinates of a point in the triangulation.
+
+        Parameters
+        ----------
+        idx : int
+            Index of the point.
+
+        Returns
+        -------
+        tuple
+            The point as (x, y).
+        """
+        return self.px[idx], self.py[idx]
+
+    def build_csr(self):
+        """Build the adjacency of the points in compressed sparse row form.
+
+        The ring of edges around each point is walked once, so that later
+        neighbour queries are a slice of a contiguous array. The adjacency is
+        stored in 'indptr' and 'neighbours' and must be rebuilt if the edges
+        are changed.
+
+        Returns
+        -------
+        indptr : numpy.ndarray
+            Array of shape (num_points + 1,), the neighbours of point 'v' are
+            'neighbours[indptr[v]:indptr[v+1]]'.
+        neighbours : numpy.ndarray
+            The neighbouring points of each point, in ccw order around it.
+        """
+        self.indptr, self.neighbours = _ring_csr(
+            self.org,
+            self.dest,
+            self.onext,
+            self.deactivate,
+            self.num_edges,
+            self.num_points,
+        )
+        return self.indptr, self.neighbours
+
+    def point_neighbours(self, v):
+        """Return the points connected to a point by an edge.
+
+        Requires the adjacency built by 'build_csr'.
+
+        Parameters
+        ----------
+        v : int
+            Index of the point.
+
+        Returns
+        -------
+        numpy.ndarray
+            Indices of the neighbouring points, in ccw order around 'v'.
+        """
+        return self.neighbours[self.indptr[v] : self.indptr[v + 1]]
 
     def shift_indices(self, shift_edges, shift_points):
         """Shift the indices of the edges and points.
@@ -319,8 +591,21 @@ class TriangulationEdges(Edges):
         shift_points : int
             The number of points to shift the indices by.
         """
-        for edge in self.edges:
-            edge.shift_indices(shift_edges, shift_points)
+        num = self.num_edges
+        for field, shift in self._index_shifts(shift_edges, shift_points):
+            values = getattr(self, field)[:num]
+            np.add(values, shift, out=values)
+
+    @staticmethod
+    def _index_shifts(shift_edges, shift_points):
+        """Pair each index field with the shift applied to its values."""
+        return (
+            ("org", shift_points),
+            ("dest", shift_points),
+            ("sym", shift_edges),
+            ("onext", shift_edges),
+            ("oprev", shift_edges),
+        )
 
     def merge_hulls(self, second_hull):
         """Merge the hulls of two triangulations.
@@ -334,19 +619,27 @@ class TriangulationEdges(Edges):
         len1 = self.num_edges
         len2 = second_hull.num_edges
 
-        # Set the correct indices for the second hull
-        second_hull.shift_indices(len1, len(self.points))
-
-        # Combine the edges data from the two triangulations
-        self.edges += second_hull.edges
+        # Combine the edges data from the two triangulations, reserving room
+        # for the edges of the merged triangulation. The indices of the second
+        # hull are shifted as they are copied, leaving second_hull unchanged.
+        num_points = self.num_points + second_hull.num_points
+        self.reserve(max(len1 + len2, EDGES_PER_POINT * num_points))
+        for field, shift in self._index_shifts(len1, self.num_points):
+            np.add(
+                getattr(second_hull, field)[:len2],
+                shift,
+                out=getattr(self, field)[len1 : len1 + len2],
+            )
+        self.deactivate[len1 : len1 + len2] = second_hull.deactivate[:len2]
         self.num_edges = len1 + len2
+        self.rebuild_free_list()
 
     def combine_triangulations(self, triangulation):
         """Combine another triangulation with this one.
 
         This method merges the convex hull of another 'TriangulationEdges'
         object with this object's convex hull. The points of the other
-        triangulation are added to the current object's points array.
+        triangulation are appended to the current object's coordinate arrays.
 
         Parameters
         ----------
@@ -360,5 +653,6 @@ class TriangulationEdges(Edges):
             the two triangulations.
         """
         self.merge_hulls(triangulation)
-        self.points += triangulation.points
+        self.px = np.concatenate((self.px, triangulation.px))
+        self.py = np.concatenate((self.py, triangulation.py))
         return self
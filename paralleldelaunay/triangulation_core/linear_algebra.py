@@ -1,8 +1,16 @@
-"""Functions for algebra on python list objects."""
+"""Functions for algebra on python list objects and scalar coordinates."""
 
 
-from math import sqrt
-from typing import Union
+import warnings
+from math import hypot
+
+import numpy as np
+
+from paralleldelaunay.triangulation_core._numba_compat import njit
+from paralleldelaunay.triangulation_core.robust_predicates import (
+    incircle,
+    orient2d,
+)
 
 # ------------------------------ Vector algebra -------------------------------
 
@@ -120,7 +128,7 @@ def normalise(vector, length=1):
     ValueError
         If the input vector has length 0.
     """
-    norm = sqrt(vector[0] ** 2 + vector[1] ** 2)
+    norm = hypot(vector[0], vector[1])
     if norm == 0:
         raise ValueError("Cannot normalise a zero-length vector")
     scale_factor = length / norm
@@ -130,30 +138,64 @@ def normalise(vector, length=1):
 # ----------------------------- Sorting functions -----------------------------
 
 
-def lexicographic_sort(
-    points: list[list[Union[int, float]]],
-) -> list[list[Union[int, float]]]:
+def lexicographic_sort_np(px, py):
+    """Sort 2D points, given as coordinate arrays, in lexicographic order.
+
+    Parameters
+    ----------
+    px : numpy.ndarray
+        The x-coordinates of the points.
+    py : numpy.ndarray
+        The y-coordinates of the points.
+
+    Returns
+    -------
+    px, py : numpy.ndarray
+        The coordinates of the points in lexicographic order, sorted by x and
+        then by y.
+    """
+    idx = np.lexsort((py, px))
+    return px[idx], py[idx]
+
+
+def lexicographic_sort(points) -> np.ndarray:
     """Sort a list of 2D points in lexicographic order.
 
     Parameters
     ----------
-    points : list[list[int | float]]
+    points : array-like
         A list of 2D points, where each point is represented as a tuple of two
-        floating-point numbers.
+        floating-point numbers, or an equivalent array of shape (n, 2).
 
     Returns
     -------
-    list[list[int | float]]
-        Points in lexicographic order.
+    numpy.ndarray
+        Points in lexicographic order, as a float64 array of shape (n, 2).
     """
-    points_sorted = sorted(points, key=lambda k: [k[0], k[1]])
-    return points_sorted
+    arr = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    order = np.lexsort((arr[:, 1], arr[:, 0]))
+    return arr[order]
 
 
 # ------------------------------- Linear algebra ------------------------------
 
+"""
+The geometric predicates below are the innermost operations of the merge step.
+Each one is implemented as a Numba compiled kernel taking the coordinates of
+the points as scalar arguments. The kernels are compiled eagerly for the
+float64 signatures below when the module is imported, so they are never
+recompiled for other argument types. The old interface taking points as lists
+is kept as deprecated wrappers with the suffix '_list'.
+"""
+
+PREDICATE_3_FLOAT = "float64(" + ", ".join(["float64"] * 6) + ")"
+PREDICATE_3_BOOL = "boolean(" + ", ".join(["float64"] * 6) + ")"
+PREDICATE_4_BOOL = "boolean(" + ", ".join(["float64"] * 8) + ")"
+PREDICATE_4_SIGN = "int8(" + ", ".join(["float64"] * 8) + ")"
+
 
-def in_circle(a, b, c, d):
+@njit(PREDICATE_4_BOOL, cache=True, inline="always")
+def in_circle(ax, ay, bx, by, cx, cy, dx, dy):
     """Test if a point is within a circle defined by three points.
 
     This function is used to check whether a point 'd' is contained by the
@@ -163,72 +205,171 @@ def in_circle(a, b, c, d):
         │ b.x  b.y  b.x**2+b.y**2  1 │
         │ c.x  c.y  c.x**2+c.y**2  1 │
         │ d.x  d.y  d.x**2+d.y**2  1 │
+    The sign of the determinant is evaluated with the adaptive precision
+    'incircle' predicate, so the result is exact even for nearly cocircular
+    points.
 
     Parameters
     ----------
-    a, b, c : list
-        The three points that define the circle.
-    d : list
-        Testing if this point is in the circle.
+    ax, ay, bx, by, cx, cy : float
+        Coordinates of the three points that define the circle.
+    dx, dy : float
+        Coordinates of the point being tested.
 
     Returns
     -------
-    out : Bool
+    bool
         True if the point 'd' is within the circle defined by 'a', 'b', 'c'.
     """
-    c1 = a[0] - d[0]
-    c2 = b[0] - d[0]
-    c3 = c[0] - d[0]
-
-    u1 = a[1] - d[1]
-    u2 = b[1] - d[1]
-    u3 = c[1] - d[1]
-
-    v1 = c1**2 + u1**2
-    v2 = c2**2 + u2**2
-    v3 = c3**2 + u3**2
-
-    det = (
-        (c1 * ((u2 * v3) - (v2 * u3)))
-        - (c2 * ((u1 * v3) - (v1 * u3)))
-        + (c3 * ((u1 * v2) - (v1 * u2)))
-    )
-    return det < 0
+    return incircle(ax, ay, bx, by, cx, cy, dx, dy) < 0
 
 
-def ccw_angle(p1, p2, p3):
+@njit(PREDICATE_4_SIGN, cache=True, inline="always")
+def in_circle_sign(ax, ay, bx, by, cx, cy, dx, dy):
+    """Return the three-valued result of the in-circle test.
+
+    Parameters
+    ----------
+    ax, ay, bx, by, cx, cy : float
+        Coordinates of the three points that define the circle.
+    dx, dy : float
+        Coordinates of the point being tested.
+
+    Returns
+    -------
+    numpy.int8
+        1 if the point 'd' is within the circle defined by 'a', 'b', 'c', -1
+        if it is outside the circle and 0 if it lies on the circle.
+    """
+    det = incircle(ax, ay, bx, by, cx, cy, dx, dy)
+    return np.int8(int(det < 0) - int(det > 0))
+
+
+@njit(PREDICATE_3_FLOAT, cache=True, inline="always")
+def ccw_angle(p1x, p1y, p2x, p2y, p3x, p3y):
     """Calculate acute angle with cross product for 3 points.
 
     Determine the acute angle defined by three points in a right-handed
-    coordinate system using the cross product.
+    coordinate system using the cross product. The value is computed with the
+    adaptive precision 'orient2d' predicate, so its sign is exact even for
+    nearly collinear points.
 
     Parameters
     ----------
-    p1, p2, p3 : list
-        The three points being tested.
+    p1x, p1y, p2x, p2y, p3x, p3y : float
+        Coordinates of the three points being tested.
 
     Returns
     -------
-    angle : float
-        The angle, in radians, between the lines defined by p1-p3 and p2-p3.
+    float
+        The signed angle between the lines defined by p1-p3 and p2-p3.
         If p3 lies to the right of the line defined by p1-p2, angle is +ve.
         If p3 lies to the left of the line defined by p1-p2, angle is -ve.
         If the points are collinear, the angle is 0.
     """
-    angle = (p1[0] - p3[0]) * (p2[1] - p3[1]) - (p1[1] - p3[1]) * (
-        p2[0] - p3[0]
-    )
-    return angle
+    return orient2d(p1x, p1y, p2x, p2y, p3x, p3y)
 
 
-def on_right(p1, p2, p3):
-    """
-    Determine if p3 is on the right side of the line from p1 to p2.
+@njit(PREDICATE_3_BOOL, cache=True, inline="always")
+def on_right(p1x, p1y, p2x, p2y, p3x, p3y):
+    """Determine if p3 is on the right side of the line from p1 to p2.
 
     The function uses the ccw_angle function to calculate the angle formed by
     the three points and checks if it is greater than 0 to determine if the
     point is on the right.
 
+    Parameters
+    ----------
+    p1x, p1y, p2x, p2y, p3x, p3y : float
+        Coordinates of the three points being tested.
+
+    Returns
+    -------
+    bool
+        Returns True if the point p3 is on the right side of the line defined
+        between the points p1 and p2.
+    """
+    return ccw_angle(p1x, p1y, p2x, p2y, p3x, p3y) > 0
+
+
+@njit(PREDICATE_3_BOOL, cache=True, inline="always")
+def on_left(p1x, p1y, p2x, p2y, p3x, p3y):
+    """Determine if p3 is on the left side of the line from p1 to p2.
+
+    The function uses the ccw_angle function to calculate the angle formed by
+    the three points and checks if it is less than 0 to determine if the point
+    is on the left.
+
+    Parameters
+    ----------
+    p1x, p1y, p2x, p2y, p3x, p3y : float
+        Coordinates of the three points being tested.
+
+    Returns
+    -------
+    bool
+        Returns True if the point p3 is on the left side of the line defined
+        between the points p1 and p2.
+    """
+    return ccw_angle(p1x, p1y, p2x, p2y, p3x, p3y) < 0
+
+
+# ------------------------- Deprecated list interface -------------------------
+
+
+def _warn_list_api(name):
+    warnings.warn(
+        f"{name}_list is deprecated, pass the point coordinates to {name}",
+        DeprecationWarning,
+        stacklevel=3,
+    )
+
+
+def in_circle_list(a, b, c, d):
+    """Test if a point is within a circle, for points given as lists.
+
+    Deprecated, use in_circle.
+
+    Parameters
+    ----------
+    a, b, c : list
+        The three points that define the circle.
+    d : list
+        Testing if this point is in the circle.
+
+    Returns
+    -------
+    out : Bool
+        True if the point 'd' is within the circle defined by 'a', 'b', 'c'.
+    """
+    _warn_list_api("in_circle")
+    return in_circle(a[0], a[1], b[0], b[1], c[0], c[1], d[0], d[1])
+
+
+def ccw_angle_list(p1, p2, p3):
+    """Calculate acute angle for 3 points given as lists.
+
+    Deprecated, use ccw_angle.
+
+    Parameters
+    ----------
+    p1, p2, p3 : list
+        The three points being tested.
+
+    Returns
+    -------
+    angle : float
+        The signed angle defined by the three points, see ccw_angle.
+    """
+    _warn_list_api("ccw_angle")
+    return ccw_angle(p1[0], p1[1], p2[0], p2[1], p3[0], p3[1])
+
+
+def on_right_list(p1, p2, p3):
+    """Determine if p3 is on the right side of the line from p1 to p2.
+
+    Deprecated, use on_right.
+
     Parameters
     ----------
     p1 : List[float]
@@ -244,16 +385,14 @@ def on_right(p1, p2, p3):
         Returns True if the point p3 is on the right side of the line defined
         between the points p1 and p2.
     """
-    return ccw_angle(p1, p2, p3) > 0
+    _warn_list_api("on_right")
+    return on_right(p1[0], p1[1], p2[0], p2[1], p3[0], p3[1])
 
 
-def on_left(p1, p2, p3):
-    """
-    Determine if p3 is on the left side of the line from p1 to p2.
+def on_left_list(p1, p2, p3):
+    """Determine if p3 is on the left side of the line from p1 to p2.
 
-    The function uses the ccw_angle function to calculate the angle formed by
-    the three points and checks if it is less than 0 to determine if the point
-    is on the left.
+    Deprecated, use on_left.
 
     Parameters
     ----------
@@ -270,4 +409,5 @@ def on_left(p1, p2, p3):
         Returns True if the point p3 is on the left side of the line defined
         between the points p1 and p2.
     """
-    return ccw_angle(p1, p2, p3) < 0
+    _warn_list_api("on_left")
+    return on_left(p1[0], p1[1], p2[0], p2[1], p3[0], p3[1])
@@ -4,7 +4,6 @@ The coordinate values are used to test the Delaunay triangulation algorithm.
 """
 
 from math import ceil, sqrt
-from typing import Union
 
 import numpy as np
 from numpy.random import default_rng
@@ -17,7 +16,7 @@ position of each point.
 """
 
 
-def random(num_points: int, span) -> list[list[Union[int, float]]]:
+def random(num_points: int, span, seed=None) -> tuple[np.ndarray, np.ndarray]:
     """Generate random x, y coordinates with NumPy.
 
     This function generates a set of random x and y coordinates using the
@@ -29,20 +28,23 @@ def random(num_points: int, span) -> list[list[Union[int, float]]]:
         The number of points to generate
     span : World class
         The world defines the range of values the coordinates can have
+    seed : int, optional
+        Seed for the random number generator.
 
     Returns
     -------
-    pts : list[list[int | float]]
-        A list of length num_points, where each element is a point
-        e.g. [ [x1, y1], [x2, y2], ... [xn, yn] ]
+    px : numpy.ndarray
+        The x-coordinates of the num_points points, as float64.
+    py : numpy.ndarray
+        The y-coordinates of the num_points points, as float64.
     """
-    x_vals = default_rng().uniform(span.x_min, span.x_max, num_points)
-    y_vals = default_rng().uniform(span.y_min, span.y_max, num_points)
-    pts = [list(i) for i in zip(x_vals.tolist(), y_vals.tolist())]
-    return pts
+    rng = default_rng(seed)
+    px = rng.uniform(span.x_min, span.x_max, num_points)
+    py = rng.uniform(span.y_min, span.y_max, num_points)
+    return px, py
 
 
-def lattice(num_points, span):
+def lattice(num_points, span, seed=None):
     """Generate evenly spaced points on grid.
 
     This function generates a set of points which are set on a grid. The points
@@ -57,23 +59,28 @@ def lattice(num_points, span):
         The number of points to generate
     span : World class
         The world defines the range of values the coordinates can have
+    seed : int, optional
+        Seed for the random number generator used to remove excess points.
 
     Returns
     -------
-    pts : list
-        A list of length num_points, where each element is a point
-        e.g. [ [x1, y1], [x2, y2], ... [xn, yn] ]
+    px : numpy.ndarray
+        The x-coordinates of the num_points points, as float64.
+    py : numpy.ndarray
+        The y-coordinates of the num_points points, as float64.
     """
     num_sqrt = ceil(sqrt(num_points))
     x_vals = np.linspace(span.x_min, span.x_max, num_sqrt)
     y_vals = np.linspace(span.y_min, span.y_max, num_sqrt)
     _x, _y = np.meshgrid(x_vals, y_vals)
-    pts = [list(i) for i in zip(_x.ravel().tolist(), _y.ravel().tolist())]
+    px, py = _x.ravel(), _y.ravel()
 
     # If the number of points is not square, remove excess points randomly
     if not sqrt(num_points).is_integer():
-        current_num = len(pts)
+        current_num = len(px)
         to_remove = current_num - num_points
-        indices = np.random.choice(current_num, to_remove, replace=False)
-        pts = [i for j, i in enumerate(pts) if j not in indices]
-    return pts
+        rng = default_rng(seed)
+        keep = np.ones(current_num, dtype=np.bool_)
+        keep[rng.choice(current_num, to_remove, replace=False)] = False
+        px, py = px[keep], py[keep]
+    return px, py
@@ -1,22 +1,24 @@
-"""Functions for splitting python lists in various ways."""
+"""Functions for splitting python lists and numpy arrays in various ways."""
 
 
 def split_in_half(input_points):
     """Split list into two halves.
 
     This function takes in a list of points, splits this list in half and
-    return the two new lists containing each subset of the input points.
+    return the two new lists containing each subset of the input points. If
+    the points are a numpy array, the halves are views of the input array
+    rather than copies, so they must not be modified.
 
     Parameters
     ----------
-    input_points : list
+    input_points : list or numpy.ndarray
         The set of points to be split
 
     Returns
     -------
-    left : list
+    left : list or numpy.ndarray
         The first half of the input points
-    right : list
+    right : list or numpy.ndarray
         The second half of the input points
     """
     mid_val = (len(input_points) + 1) // 2
@@ -30,23 +32,24 @@ def groups_of_3(points):
 
     Parameters
     ----------
-    points : list
+    points : list or numpy.ndarray
         List of points to split.
 
     Returns
     -------
     list
-        List of sublists, where each sublist contains 3 points. The last
-        sublist may contain 1 or 2 points if the length of 'points' is not a
-        multiple of 3.
+        List of slices of 'points', where each slice contains 3 points. If
+        the length of 'points' is not a multiple of 3, the first one or two
+        slices contain 2 points instead. A single point is returned as a
+        single slice of 1 point.
     """
     num = len(points)
-    if num % 3 == 0:
-        return [points[i : i + 3] for i in range(0, num, 3)]
-    elif num % 3 == 1:
-        split = [points[i : i + 2] for i in range(0, 4, 2)]
-        split2 = [points[i : i + 3] for i in range(4, num, 3)]
-    elif num % 3 == 2:
-        split = [[points[0], points[1]]]
-        split2 = [points[i : i + 3] for i in range(2, num, 3)]
-    return split + split2
+    if num == 1:
+        return [points[:]]
+
+    # One or two pairs at the start make the rest a whole number of triples
+    num_pairs = -num % 3
+    pairs_end = 2 * num_pairs
+    pairs = [points[i : i + 2] for i in range(0, pairs_end, 2)]
+    triples = [points[i : i + 3] for i in range(pairs_end, num, 3)]
+    return pairs + triples
@@ -0,0 +1,268 @@
+"""Adaptive precision geometric predicates.
+
+The orientation and in-circle tests are implemented following:
+    J. R. Shewchuk, "Adaptive Precision Floating-Point Arithmetic and Fast
+    Robust Geometric Predicates" (1997)
+Each predicate first evaluates the determinant in ordinary floating-point
+arithmetic together with an a priori bound on its rounding error. Only if the
+result is smaller than this bound, so its sign cannot be trusted, is the
+determinant recomputed exactly using floating-point expansions. For well
+conditioned input the cost is therefore the same as the naive determinant.
+"""
+
+import numpy as np
+
+from paralleldelaunay.triangulation_core._numba_compat import njit
+
+# --------------------------------- Constants ---------------------------------
+
+EPSILON = 2.0**-53
+SPLITTER = 2.0**27 + 1.0
+CCW_ERR_BOUND_A = (3.0 + 16.0 * EPSILON) * EPSILON
+ICC_ERR_BOUND_A = (10.0 + 96.0 * EPSILON) * EPSILON
+
+# ---------------------------- Error-free transforms --------------------------
+
+"""
+The following functions compute the exact result of a floating-point sum,
+difference or product as the sum of two non-overlapping doubles, the rounded
+result 'x' and its round-off error 'y'.
+"""
+
+
+@njit(cache=True, inline="always")
+def _two_sum(a, b):
+    x = a + b
+    b_virt = x - a
+    a_virt = x - b_virt
+    return x, (a - a_virt) + (b - b_virt)
+
+
+@njit(cache=True, inline="always")
+def _two_diff(a, b):
+    x = a - b
+    b_virt = a - x
+    a_virt = x + b_virt
+    return x, (a - a_virt) + (b_virt - b)
+
+
+@njit(cache=True, inline="always")
+def _split(a):
+    c = SPLITTER * a
+    a_big = c - a
+    a_hi = c - a_big
+    return a_hi, a - a_hi
+
+
+@njit(cache=True, inline="always")
+def _two_product(a, b):
+    x = a * b
+    a_hi, a_lo = _split(a)
+    b_hi, b_lo = _split(b)
+    err1 = x - (a_hi * b_hi)
+    err2 = err1 - (a_lo * b_hi)
+    err3 = err2 - (a_hi * b_lo)
+    return x, (a_lo * b_lo) - err3
+
+
+# ---------------------------- Expansion arithmetic ---------------------------
+
+"""
+An expansion is a float64 array of non-overlapping components, sorted by
+increasing magnitude, whose exact sum is the value represented. Zero
+components are eliminated, so the sign of an expansion is the sign of its
+last component.
+"""
+
+
+@njit(cache=True)
+def _grow_expansion(e, b):
+    h = np.empty(len(e) + 1)
+    q = b
+    h_len = 0
+    for e_i in e:
+        q, hh = _two_sum(q, e_i)
+        if hh != 0.0:
+            h[h_len] = hh
+            h_len += 1
+    if q != 0.0 or h_len == 0:
+        h[h_len] = q
+        h_len += 1
+    return h[:h_len]
+
+
+@njit(cache=True)
+def _expansion_sum(e, f):
+    h = e
+    for f_i in f:
+        h = _grow_expansion(h, f_i)
+    return h
+
+
+@njit(cache=True)
+def _scale_expansion(e, b):
+    h = np.empty(2 * len(e))
+    h_len = 0
+    q, hh = _two_product(e[0], b)
+    if hh != 0.0:
+        h[h_len] = hh
+        h_len += 1
+    for e_i in e[1:]:
+        product1, product0 = _two_product(e_i, b)
+        sum_, hh = _two_sum(q, product0)
+        if hh != 0.0:
+            h[h_len] = hh
+            h_len += 1
+        q, hh = _two_sum(product1, sum_)
+        if hh != 0.0:
+            h[h_len] = hh
+            h_len += 1
+    if q != 0.0 or h_len == 0:
+        h[h_len] = q
+        h_len += 1
+    return h[:h_len]
+
+
+@njit(cache=True)
+def _expansion_product(e, f):
+    h = _scale_expansion(e, f[0])
+    for f_i in f[1:]:
+        h = _expansion_sum(h, _scale_expansion(e, f_i))
+    return h
+
+
+@njit(cache=True)
+def _exact_diff(a, b):
+    x, y = _two_diff(a, b)
+    return np.array([y, x])
+
+
+@njit(cache=True)
+def _exact_cross(ax, ay, bx, by):
+    """Return the expansion of ax*by - ay*bx for expansions ax, ay, bx, by."""
+    return _expansion_sum(
+        _expansion_product(ax, by), -_expansion_product(ay, bx)
+    )
+
+
+# ------------------------------- Predicates ----------------------------------
+
+
+@njit(cache=True)
+def _orient2d_exact(ax, ay, bx, by, cx, cy):
+    det = _exact_cross(
+        _exact_diff(ax, cx),
+        _exact_diff(ay, cy),
+        _exact_diff(bx, cx),
+        _exact_diff(by, cy),
+    )
+    return det[-1]
+
+
+@njit(cache=True)
+def orient2d(ax, ay, bx, by, cx, cy):
+    """Adaptive orientation test for three points.
+
+    Parameters
+    ----------
+    ax, ay, bx, by, cx, cy : float
+        Coordinates of the three points 'a', 'b', 'c'.
+
+    Returns
+    -------
+    float
+        Positive if the points 'a', 'b', 'c' occur in counterclockwise order,
+        negative if they occur in clockwise order and zero if they are
+        collinear. The result approximates twice the signed area of the
+        triangle and its sign is always exact.
+    """
+    det_left = (ax - cx) * (by - cy)
+    det_right = (ay - cy) * (bx - cx)
+    det = det_left - det_right
+
+    # If the two products have opposite signs or one is zero, the bound is
+    # below the magnitude of det and its sign is exact
+    err_bound = CCW_ERR_BOUND_A * (abs(det_left) + abs(det_right))
+    if det >= err_bound or -det >= err_bound:
+        return det
+    return _orient2d_exact(ax, ay, bx, by, cx, cy)
+
+
+@njit(cache=True)
+def _incircle_exact(ax, ay, bx, by, cx, cy, dx, dy):
+    adx, ady = _exact_diff(ax, dx), _exact_diff(ay, dy)
+    bdx, bdy = _exact_diff(bx, dx), _exact_diff(by, dy)
+    cdx, cdy = _exact_diff(cx, dx), _exact_diff(cy, dy)
+
+    a_lift = _expansion_sum(
+        _expansion_product(adx, adx), _expansion_product(ady, ady)
+    )
+    b_lift = _expansion_sum(
+        _expansion_product(bdx, bdx), _expansion_product(bdy, bdy)
+    )
+    c_lift = _expansion_sum(
+        _expansion_product(cdx, cdx), _expansion_product(cdy, cdy)
+    )
+
+    det = _expansion_product(a_lift, _exact_cross(bdx, bdy, cdx, cdy))
+    det = _expansion_sum(
+        det, _expansion_product(b_lift, _exact_cross(cdx, cdy, adx, ady))
+    )
+    det = _expansion_sum(
+        det, _expansion_product(c_lift, _exact_cross(adx, ady, bdx, bdy))
+    )
+    return det[-1]
+
+
+@njit(cache=True)
+def incircle(ax, ay, bx, by, cx, cy, dx, dy):
+    """Adaptive in-circle test for four points.
+
+    Parameters
+    ----------
+    ax, ay, bx, by, cx, cy : float
+        Coordinates of the three points 'a', 'b', 'c' defining the circle.
+    dx, dy : float
+        Coordinates of the point 'd' being tested.
+
+    Returns
+    -------
+    float
+        Positive if 'd' lies inside the circle through 'a', 'b', 'c' when
+        these occur in counterclockwise order, negative if it lies outside
+        and zero if the four points are cocircular. The sign is reversed if
+        'a', 'b', 'c' occur in clockwise order. The sign is always exact.
+    """
+    adx = ax - dx
+    bdx = bx - dx
+    cdx = cx - dx
+    ady = ay - dy
+    bdy = by - dy
+    cdy = cy - dy
+
+    bdxcdy = bdx * cdy
+    cdxbdy = cdx * bdy
+    a_lift = adx * adx + ady * ady
+
+    cdxady = cdx * ady
+    adxcdy = adx * cdy
+    b_lift = bdx * bdx + bdy * bdy
+
+    adxbdy = adx * bdy
+    bdxady = bdx * ady
+    c_lift = cdx * cdx + cdy * cdy
+
+    det = (
+        a_lift * (bdxcdy - cdxbdy)
+        + b_lift * (cdxady - adxcdy)
+        + c_lift * (adxbdy - bdxady)
+    )
+    permanent = (
+        (abs(bdxcdy) + abs(cdxbdy)) * a_lift
+        + (abs(cdxady) + abs(adxcdy)) * b_lift
+        + (abs(adxbdy) + abs(bdxady)) * c_lift
+    )
+    err_bound = ICC_ERR_BOUND_A * permanent
+    if det > err_bound or -det > err_bound:
+        return det
+    return _incircle_exact(ax, ay, bx, by, cx, cy, dx, dy)
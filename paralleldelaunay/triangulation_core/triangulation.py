@@ -5,14 +5,34 @@ algorithm as presented in:
     L. J. Guibas, J. Stolfi, "Primitives for the manipulation of general
     subdivisions and the computation of Voronoi diagrams" (1985)
 This algorithm computes the Delaunay triangulation of a set of input points.
+
+The merge of two triangulations is written out step by step in
+lowest_common_tangent, combine_triangulations and zip_hulls. These are the
+reference implementation of the merge and are not used by triangulate, which
+runs the same steps in a single compiled call, see merge_two.
 """
 
-import paralleldelaunay.triangulation_core.linear_algebra as linalg
-import paralleldelaunay.triangulation_core.points_tools.split_list as split_list
+import os
+import warnings
+from multiprocessing import get_context
+from multiprocessing.pool import ThreadPool
+
+import numpy as np
+
+from paralleldelaunay.triangulation_core import _merge_numba
+from paralleldelaunay.triangulation_core.edge_topology import (
+    EDGES_PER_POINT,
+    TriangulationEdges,
+)
 from paralleldelaunay.triangulation_core.triangulation_primitives import (
-    make_primitives,
+    make_primitives_np,
 )
 
+# Number of groups of primitives merged to completion at a time when merging
+# sequentially. A block of 256 groups holds around 1500 points, whose edge and
+# point arrays fit in a typical 256 KiB L2 cache.
+MERGE_BLOCK_SIZE = 256
+
 # --------------------------- Edge finding functions --------------------------
 
 
@@ -34,156 +54,61 @@ def lowest_common_tangent(h_left, h_right):
     Returns
     -------
     left_e : int
-        The index of the edge in the right hull which forms one end of the
+        The index of the edge in the left hull which forms one end of the
         base edge.
     right_e : int
-        The index of the edge in the left hull which forms the other end of
+        The index of the edge in the right hull which forms the other end of
         the base edge.
     """
-    left_e = h_left.outer
-    right_e = h_right.inner
-
-    pts_left = h_left.points
-    pts_right = h_right.points
-
-    p1 = pts_left[h_left.edges[left_e].org]
-    p2 = pts_left[h_left.edges[left_e].dest]
-
-    p4 = pts_right[h_right.edges[right_e].org]
-    p5 = pts_right[h_right.edges[right_e].dest]
-
-    while True:
-        if linalg.on_right(p1, p2, pts_right[h_right.edges[right_e].org]):
-            left_e = h_left.edges[h_left.edges[left_e].sym].onext
-
-            p1 = pts_left[h_left.edges[left_e].org]
-            p2 = pts_left[h_left.edges[left_e].dest]
-
-        elif linalg.on_left(p4, p5, pts_left[h_left.edges[left_e].org]):
-            right_e = h_right.edges[h_right.edges[right_e].sym].oprev
-            p4 = pts_right[h_right.edges[right_e].org]
-            p5 = pts_right[h_right.edges[right_e].dest]
-
-        else:
-            return left_e, right_e
-
-
-def rcand_func(rhull, rcand, b1, b2):
-    """Search right hull for candidate edge.
-
-    This function finds the candidate edge from the right hull triangulation.
-    An initial candidate 'rcand' is given. This candidate is tested. If the
-    candidate fails it is deleted from the triangulation and the next
-    potential candidate is considered. While a valid candidate has not been
-    found this process continues until a valid candidate is found.
-
-    Parameters
-    ----------
-    rhull : TriangulationEdges
-        The triangulation of edges on the right hand side.
-    rcand : TYPE
-        DESCRIPTION.
-    b1 : list
-        DESCRIPTION.
-    b2 : list
-        DESCRIPTION.
-
-    Returns
-    -------
-    rhull : TriangulationEdges
-        DESCRIPTION.
-    rcand : TYPE
-        DESCRIPTION.
-    """
-    completed = False
-    while not completed:
-        rcand_onext_dest = rhull.edges[rhull.edges[rcand].onext].dest
-        rcand_dest = rhull.edges[rcand].dest
-        ccw_test = linalg.on_right(b1, b2, rhull.points[rcand_onext_dest])
-        next_cand_invalid = linalg.in_circle(
-            b2, b1, rhull.points[rcand_dest], rhull.points[rcand_onext_dest]
-        )
-        if ccw_test and next_cand_invalid:
-            t = rhull.edges[rcand].onext
-            rhull.kill_edge(rcand)
-            rcand = t
-        else:
-            completed = True
-    return rhull, rcand
-
-
-def lcand_func(lhull, lcand, b1, b2):
-    """Test for the left candidate edge, similar to rcand_func."""
-    completed = False
-    while not completed:
-        lcand_oprev_dest = lhull.edges[lhull.edges[lcand].oprev].dest
-        lcand_dest = lhull.edges[lcand].dest
-        ccw_test = linalg.on_right(b1, b2, lhull.points[lcand_oprev_dest])
-        next_cand_invalid = linalg.in_circle(
-            b2, b1, lhull.points[lcand_dest], lhull.points[lcand_oprev_dest]
-        )
-        if ccw_test and next_cand_invalid:
-            t = lhull.edges[lcand].oprev
-            lhull.kill_edge(lcand)
-            lcand = t
-        else:
-            completed = True
-    return lhull, lcand
-
-
-def candidate_decider(rcand, lcand, lcand_valid, triangulation):
-    """Choose correct edge for triangulation.
-
-    Given two potential edges which could be added to the triangulation,
-    decide which of the edges is the correct one to add.
-
-    Parameters
-    ----------
-    rcand : int
-        Index of right candidate edge.
-    lcand : int
-        Index of left candidate edge.
-    lcand_valid : TYPE
-        DESCRIPTION.
-    triangulation : TriangulationEdges
-        DESCRIPTION.
-
-    Returns
-    -------
-    result : bool
-        DESCRIPTION.
-    """
-    pt1 = triangulation.points[triangulation.edges[rcand].dest]
-    pt2 = triangulation.points[triangulation.edges[rcand].org]
-    pt3 = triangulation.points[triangulation.edges[lcand].org]
-    pt4 = triangulation.points[triangulation.edges[lcand].dest]
-    result = lcand_valid and linalg.in_circle(pt1, pt2, pt3, pt4)
-    return result
+    return _merge_numba.lowest_common_tangent(
+        h_left.px,
+        h_left.py,
+        h_left.org,
+        h_left.dest,
+        h_left.sym,
+        h_left.onext,
+        int(h_left.outer),
+        h_right.px,
+        h_right.py,
+        h_right.org,
+        h_right.dest,
+        h_right.sym,
+        h_right.oprev,
+        int(h_right.inner),
+    )
 
 
 # ----------------------------- Merging functions -----------------------------
 
 
 def combine_triangulations(ldi, rdi, hull_left, hull_right):
-    """Merge two TriangulationEdges objects into one.
+    """Combine two triangulations and connect them with the base edge.
+
+    The right triangulation is appended to the left one and the base edge
+    found by lowest_common_tangent is created. The extreme edges of the
+    combined triangulation are corrected if the base edge replaces one of
+    them.
 
     Parameters
     ----------
-    ldi : TYPE
-        DESCRIPTION.
-    rdi : TYPE
-        DESCRIPTION.
+    ldi : int
+        Index of the edge of the left triangulation at the left end of the
+        base edge, as returned by lowest_common_tangent.
+    rdi : int
+        Index of the edge of the right triangulation at the right end of the
+        base edge, as returned by lowest_common_tangent.
     hull_left : TriangulationEdges
-        DESCRIPTION.
+        The triangulation of the left points, modified in place to hold the
+        combined triangulation.
     hull_right : TriangulationEdges
-        DESCRIPTION.
+        The triangulation of the right points, which is not modified.
 
     Returns
     -------
-    base : TYPE
-        DESCRIPTION.
+    base : int
+        Index of the base edge in the combined triangulation.
     edges : TriangulationEdges
-        DESCRIPTION.
+        The combined triangulation, the same object as 'hull_left'.
     """
     ldo = hull_left.inner
     rdo = hull_right.outer
@@ -191,18 +116,15 @@ def combine_triangulations(ldi, rdi, hull_left, hull_right):
     rdo += hull_left.num_edges
 
     edges = hull_left.combine_triangulations(hull_right)
-    base = edges.connect(edges.edges[ldi].sym, rdi)
-
-    # Correct the base edge
-    ldi_org = edges.points[edges.edges[ldi].org]
-    ldo_org = edges.points[edges.edges[ldo].org]
-    rdi_org = edges.points[edges.edges[rdi].org]
-    rdo_org = edges.points[edges.edges[rdo].org]
+    base = edges.connect(edges.sym[ldi], rdi)
 
-    if linalg.list_equal(ldi_org, ldo_org):
+    # Correct the base edge, the edges share an origin point if their origin
+    # indices are equal
+    org = edges.org
+    if org[ldi] == org[ldo]:
         ldo = base
-    if linalg.list_equal(rdi_org, rdo_org):
-        rdo = edges.edges[base].sym
+    if org[rdi] == org[rdo]:
+        rdo = edges.sym[base]
 
     edges.set_extreme_edges(ldo, rdo)
 
@@ -214,7 +136,8 @@ def zip_hulls(base, triang):
 
     Given a triangulation containing two separate hulls and the base edge
     connecting the hulls, triangulate the space between the hulls. This is
-    referred to as 'zipping' the hulls together.
+    referred to as 'zipping' the hulls together. The merge loop itself runs
+    in the compiled kernel '_merge_numba.zip_hulls'.
 
     Parameters
     ----------
@@ -229,137 +152,294 @@ def zip_hulls(base, triang):
         Instance of TriangulationEdges class object containing the finished
         Delaunay triangulation of the input triangulation.
     """
-    while True:
-        # Make variables for commonly used base edge points
-        base1 = triang.points[triang.edges[base].org]
-        base2 = triang.points[triang.edges[base].dest]
-
-        # Find the first candidate edges for triangulation from each subset
-        rcand = triang.edges[triang.edges[base].sym].onext
-        pt1 = triang.points[triang.edges[rcand].dest]
-        rcand_valid = linalg.on_right(base1, base2, pt1)
-
-        lcand = triang.edges[base].oprev
-        pt2 = triang.points[triang.edges[lcand].dest]
-        lcand_valid = linalg.on_right(base1, base2, pt2)
-
-        # If neither candidate is valid, hull merge is complete
-        if not rcand_valid and not lcand_valid:
-            break
+    # The edges always form a planar subdivision of n points, which has at
+    # most 6n directed edges. Killed slots are reused before the arrays are
+    # extended, so the merge never needs more than 6n slots
+    triang.reserve(max(EDGES_PER_POINT * triang.num_points, 8))
+    triang.num_edges, triang.free_head = _merge_numba.zip_hulls(
+        triang.px,
+        triang.py,
+        triang.org,
+        triang.dest,
+        triang.sym,
+        triang.onext,
+        triang.oprev,
+        triang.deactivate,
+        triang.num_edges,
+        triang.free_head,
+        base,
+    )
+    return triang
 
-        if rcand_valid:
-            triang, rcand = rcand_func(triang, rcand, base1, base2)
 
-        if lcand_valid:
-            triang, lcand = lcand_func(triang, lcand, base1, base2)
+def merge_pair(group):
+    """Merge a group of one or two triangulations into a single triangulation.
 
-        lcand_strong_valid = candidate_decider(
-            rcand, lcand, lcand_valid, triang
-        )
+    This is a module level function so that it can be sent to the worker
+    processes of a multiprocessing pool.
 
-        if not rcand_valid or lcand_strong_valid:
-            base = triang.connect(lcand, triang.edges[base].sym)
-        else:
-            base = triang.connect(
-                triang.edges[base].sym, triang.edges[rcand].sym
-            )
-    return triang
+    Parameters
+    ----------
+    group : list
+        List of one or two adjacent triangulations.
 
+    Returns
+    -------
+    TriangulationEdges
+        The merged triangulation.
+    """
+    if len(group) != 2:
+        return group[0]
+    return merge_two(group[0], group[1])
 
-def merge_triangulations(groups):
-    """Combine pairs of triangulations.
 
-    Each entry of the groups list is a list of two (or one) triangulations.
-    This function takes each pair of triangulations and combines them.
+def merge_two(left, right):
+    """Merge two adjacent triangulations into a single triangulation.
 
     Parameters
     ----------
-    groups : list
-        List of pairs of triangulations.
+    left : TriangulationEdges
+        The triangulation of the left points.
+    right : TriangulationEdges
+        The triangulation of the right points.
 
     Returns
     -------
-    list
-        List of merged triangulations.
+    TriangulationEdges
+        The merged triangulation.
     """
-    triangulations = []
-    for group in groups:
-        if len(group) == 2:
-            # Find the first edges to connect the separate triangulations
-            ldi, rdi = lowest_common_tangent(group[0], group[1])
-
-            # Combine the two hulls into a single set of edges
-            base, d_triang = combine_triangulations(
-                ldi, rdi, group[0], group[1]
+    # Find the base edge, combine the two hulls and fill in the edges between
+    # them, the same steps as lowest_common_tangent, combine_triangulations
+    # and zip_hulls but in a single compiled call
+    *arrays, inner, outer = _merge_numba.merge_hulls(
+        left.px,
+        left.py,
+        left.org,
+        left.dest,
+        left.sym,
+        left.onext,
+        left.oprev,
+        left.deactivate,
+        left.num_edges,
+        int(left.inner),
+        int(left.outer),
+        right.px,
+        right.py,
+        right.org,
+        right.dest,
+        right.sym,
+        right.onext,
+        right.oprev,
+        right.deactivate,
+        right.num_edges,
+        int(right.inner),
+        int(right.outer),
+    )
+    d_triang = TriangulationEdges.from_arrays(*arrays)
+    d_triang.set_extreme_edges(int(inner), int(outer))
+    return d_triang
+
+
+def merge_level(triangulations, pool=None):
+    """Merge each pair of adjacent triangulations, one level of the merge tree.
+
+    The list is modified in place: the merged triangulation of each pair is
+    stored in the first half of the list and the second half is deleted. If
+    the list has odd length, its last triangulation is carried up unmerged.
+
+    Parameters
+    ----------
+    triangulations : list
+        List of triangulations, in order of their points.
+    pool : multiprocessing.pool.Pool, optional
+        Pool of worker processes, or a ThreadPool, used to merge the pairs.
+        If None, the pairs are merged sequentially in this process.
+    """
+    num = len(triangulations)
+    if pool is None or num <= 2:
+        # Slot i // 2 is written only after slots i and i + 1 have been read
+        for i in range(0, num - 1, 2):
+            triangulations[i // 2] = merge_two(
+                triangulations[i], triangulations[i + 1]
             )
+        if num % 2:
+            triangulations[num // 2] = triangulations[-1]
+        del triangulations[(num + 1) // 2 :]
+        return
 
-            # Given the starting base edge, fill in the edges between the hulls
-            d_triang = zip_hulls(base, d_triang)
-            triangulations.append(d_triang)
-        else:
-            triangulations.append(group[0])
-    return [
-        triangulations[i : i + 2] for i in range(0, len(triangulations), 2)
-    ]
+    # The order of the results must be kept, as only adjacent triangulations
+    # can be merged. The groups are read lazily by the pool, so the list is
+    # only replaced once all of the results have been collected.
+    groups = (triangulations[i : i + 2] for i in range(0, num, 2))
+    chunksize = max(1, num // (8 * (os.cpu_count() or 1)))
+    merged = list(pool.imap(merge_pair, groups, chunksize))
+    triangulations[:] = merged
 
 
-def recursive_group_merge(groups):
-    """Call merge_triangulations() recursively for triangulation.
+def merge_all(triangulations, pool=None):
+    """Merge a list of adjacent triangulations into a single triangulation.
 
-    Recursively merge triangulations in 'groups' until all points have been
-    triangulated.
+    The merge tree is swept bottom-up, one call of merge_level() per level.
+    When merging sequentially, blocks of MERGE_BLOCK_SIZE adjacent groups are
+    each merged to completion first, before the results of the blocks are
+    merged together.
 
     Parameters
     ----------
-    groups : list
-        List of pairs of triangulations.
+    triangulations : list
+        List of triangulations, in order of their points. The list itself is
+        not modified.
+    pool : multiprocessing.pool.Pool, optional
+        Pool of worker processes passed on to merge_level().
 
     Returns
     -------
-    list
-        List containing the single completed Delauney triangulation.
+    TriangulationEdges
+        The completed Delauney triangulation.
     """
-    while len(groups[0]) != 1:
-        groups = merge_triangulations(groups)
-    return groups
+    block_size = 2 * MERGE_BLOCK_SIZE
+    if pool is None and len(triangulations) > block_size:
+        # Merge each block of adjacent triangulations into a single
+        # triangulation before moving on to the next block, so that the
+        # working set of the lower levels of the merge tree stays in cache
+        triangulations = [
+            merge_all(triangulations[i : i + block_size])
+            for i in range(0, len(triangulations), block_size)
+        ]
+    else:
+        triangulations = list(triangulations)
+
+    while len(triangulations) > 1:
+        merge_level(triangulations, pool)
+    return triangulations[0]
 
 
 # ------------------------------- Main function -------------------------------
 
 
-def triangulate(pts_subset):
-    """Perform triangulation in four steps for a list of input points.
+def triangulate(pts_subset, processes=1, threads=True):
+    """Perform triangulation in five steps for a set of input points.
 
-    This function encapsulates the whole triangulation algorithm into four
-    steps. The function takes as input a list of points. Each point is of the
-    form [x, y], where x and y are the coordinates of the point.
+    This function encapsulates the whole triangulation algorithm into five
+    steps. The function takes as input the points as an array of shape
+    (n, 2), or anything numpy.asarray converts to one, where each row holds
+    the x and y coordinates of a point.
 
-    Step 1) The list of points is split into groups. Each group has exactly
-            two or three points.
+    Step 1) The coordinate arrays of the points are split into groups by
+            make_primitives_np. Each group has exactly two or three points.
     Step 2) For each group of two point, a single edge is generated. For each
             group of three points, three edges forming a triangle are
             generated. These are the 'primitive' triangulations.
-    Step 3) The primitive triangulations are paired into groups.
-    Step 4) The groups are then recursively merged until there is only a
-            single triangulation of all points remaining.
+    Step 3) Each pair of adjacent primitive triangulations is merged, giving
+            half as many triangulations.
+    Step 4) Step 3 is repeated on the merged triangulations until there is
+            only a single triangulation of all points remaining.
+    Step 5) The edges deleted during merging are removed from the final
+            triangulation, see TriangulationEdges.filter_deactivated.
 
     Parameters
     ----------
-    pts_subset : list
+    pts_subset : list or numpy.ndarray
         A list of points with the form [ [x1, y1], [x2, y2], ..., [xn, yn] ]
+        or an equivalent array of shape (n, 2), in lexicographic order.
         The first element of each list represents the x-coordinate, the second
         entry the y-coordinate.
+    processes : int, optional
+        Number of workers used to merge the triangulations in steps 3 and 4.
+        If None, the number of CPUs is used. Default is 1, which merges the
+        triangulations sequentially without starting a pool. Worker processes,
+        see 'threads', are started with the 'spawn' method, so a script using
+        them must call triangulate under an 'if __name__ == "__main__":' guard.
+    threads : bool, optional
+        If True, the workers are threads of this process. The compiled merge
+        releases the GIL, so the merges run in parallel without copying the
+        triangulations. If False, the workers are separate processes, and
+        each pair of triangulations is pickled to a worker and the merged
+        triangulation pickled back, which usually costs more than the merge
+        itself. Default is True.
 
     Returns
     -------
-    out : list
-        List with a single element. The TriangulationEdges class object with
-        the completed Delauney triangulation of the input points.
+    TriangulationEdges
+        The completed Delauney triangulation of the input points.
         See TriangulationEdges docstring for further info.
     """
-    split_pts = split_list.groups_of_3(pts_subset)
-    primitives = make_primitives(split_pts)
-    # group the primitives into pairs of adjacent primitives
-    groups = [primitives[i : i + 2] for i in range(0, len(primitives), 2)]
-    groups = recursive_group_merge(groups)
-    return groups[0][0]
+    points = np.asarray(pts_subset, dtype=np.float64)
+    primitives = make_primitives_np(points[:, 0], points[:, 1])
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes > 1 and len(primitives) > 2:
+        if threads:
+            pool = ThreadPool(processes)
+        else:
+            # The parallel base layer has started the Numba worker threads,
+            # and forking a process with running threads is unsafe, so the
+            # worker processes are spawned instead
+            pool = get_context("spawn").Pool(processes)
+        with pool:
+            triangulation = merge_all(primitives, pool)
+    else:
+        triangulation = merge_all(primitives)
+    triangulation.filter_deactivated()
+    return triangulation
+
+
+# ------------------------ Deprecated group interface -------------------------
+
+
+def _warn_group_api(name):
+    warnings.warn(
+        f"{name} is deprecated, pass a flat list of triangulations to "
+        "merge_all",
+        DeprecationWarning,
+        stacklevel=3,
+    )
+
+
+def merge_triangulations(groups, pool=None):
+    """Combine pairs of triangulations.
+
+    Deprecated, use merge_level or merge_all.
+
+    Parameters
+    ----------
+    groups : list
+        List of pairs of triangulations.
+    pool : multiprocessing.pool.Pool, optional
+        Pool of worker processes used to merge the pairs. If None, the pairs
+        are merged sequentially in this process.
+
+    Returns
+    -------
+    list
+        List of pairs of the merged triangulations.
+    """
+    _warn_group_api("merge_triangulations")
+    triangulations = [triang for group in groups for triang in group]
+    merge_level(triangulations, pool)
+    return [
+        triangulations[i : i + 2] for i in range(0, len(triangulations), 2)
+    ]
+
+
+def recursive_group_merge(groups, pool=None):
+    """Merge groups of triangulations until all points have been triangulated.
+
+    Deprecated, use merge_all.
+
+    Parameters
+    ----------
+    groups : list
+        List of pairs of triangulations.
+    pool : multiprocessing.pool.Pool, optional
+        Pool of worker processes passed on to merge_all().
+
+    Returns
+    -------
+    list
+        List containing the single completed Delauney triangulation, in the
+        same nested form as the groups, [[triangulation]].
+    """
+    _warn_group_api("recursive_group_merge")
+    triangulations = [triang for group in groups for triang in group]
+    return [[merge_all(triangulations, pool)]]
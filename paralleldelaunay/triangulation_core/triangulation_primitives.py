@@ -4,138 +4,221 @@ This module contains functions for creating triangulations from 2 and 3 points,
 respectively known as the line-primitive and the triangle-primitive.
 """
 
+import warnings
+from math import ceil
+
+import numpy as np
 
 import paralleldelaunay.triangulation_core.edge_topology as edge_topology
 import paralleldelaunay.triangulation_core.linear_algebra as linalg
+from paralleldelaunay.triangulation_core._numba_compat import njit, prange
+
+# ------------------------------ Edge templates -------------------------------
+
+"""
+Edge arrays of the triangle primitive. The edges 0: p1-p2 and 2: p2-p3 are
+joined at p2, and the edge 4: p3-p1 closes the triangle, each followed by its
+symmetric edge. Every point of a triangle has two edges, so the next and
+previous ccw edges around the origin coincide.
+"""
+
+TRIANGLE_EDGES = {
+    "org": [0, 1, 1, 2, 2, 0],
+    "dest": [1, 0, 2, 1, 0, 2],
+    "sym": [1, 0, 3, 2, 5, 4],
+    "onext": [5, 2, 1, 4, 3, 0],
+    "oprev": [5, 2, 1, 4, 3, 0],
+}
+COLLINEAR_EDGES = {
+    "org": [0, 1, 1, 2],
+    "dest": [1, 0, 2, 1],
+    "sym": [1, 0, 3, 2],
+    "onext": [0, 2, 1, 3],
+    "oprev": [0, 2, 1, 3],
+}
+
+# The templates as arrays of shape (5, num_edges) for the compiled base layer,
+# the rows are the fields 'org', 'dest', 'sym', 'onext' and 'oprev'
+_TEMPLATE_FIELDS = ("org", "dest", "sym", "onext", "oprev")
+_TRIANGLE_TEMPLATE = np.array(
+    [TRIANGLE_EDGES[field] for field in _TEMPLATE_FIELDS],
+    dtype=edge_topology.INDEX_DTYPE,
+)
+_COLLINEAR_TEMPLATE = np.array(
+    [COLLINEAR_EDGES[field] for field in _TEMPLATE_FIELDS],
+    dtype=edge_topology.INDEX_DTYPE,
+)
+_LINE_TEMPLATE = np.array(
+    [[0, 1], [1, 0], [1, 0], [0, 1], [0, 1]], dtype=edge_topology.INDEX_DTYPE
+)
+
+# -------------------------------- Base layer ---------------------------------
+
+"""
+The primitives of all groups are independent of each other, so the compiled
+base layer builds them in parallel. Every group writes only to its own row of
+the output arrays.
+"""
+
+
+@njit(cache=True, parallel=True)
+def _build_base_layer(px, py, starts, sizes, edges, num_edges, extremes):
+    triangle = _TRIANGLE_TEMPLATE
+    collinear = _COLLINEAR_TEMPLATE
+    line = _LINE_TEMPLATE
+    for g in prange(len(starts)):
+        s = starts[g]
+        if sizes[g] == 2:
+            template = line
+            extremes[g, 0], extremes[g, 1] = 0, 1
+        else:
+            orientation = linalg.ccw_angle(
+                px[s], py[s], px[s + 1], py[s + 1], px[s + 2], py[s + 2]
+            )
+            if orientation == 0:
+                template = collinear
+            else:
+                template = triangle
+            if orientation < 0:
+                extremes[g, 0], extremes[g, 1] = 5, 4
+            else:
+                extremes[g, 0], extremes[g, 1] = 0, 3
+        num = template.shape[1]
+        for field in range(5):
+            for e in range(num):
+                edges[field, g, e] = template[field, e]
+        num_edges[g] = num
+
+
+def make_primitives_np(px, py):
+    """Create the geometric primitives of points given as coordinate arrays.
+
+    The points are split into ceil(n/3) consecutive groups of 2 or 3 points,
+    whose sizes differ by at most one. The edges of all primitives are built
+    by a single parallel kernel, each primitive views one row of the
+    resulting arrays.
+
+    Parameters
+    ----------
+    px : numpy.ndarray
+        The x-coordinates of the points, in lexicographic order.
+    py : numpy.ndarray
+        The y-coordinates of the points, in lexicographic order.
+
+    Returns
+    -------
+    list of TriangulationEdges
+        List of the line and triangle primitives for consecutive groups of
+        points.
+
+    Raises
+    ------
+    ValueError
+        If there are fewer than 2 points.
+    """
+    px = np.ascontiguousarray(px, dtype=np.float64)
+    py = np.ascontiguousarray(py, dtype=np.float64)
+    num_points = len(px)
+    if num_points < 2:
+        raise ValueError(f"Need at least 2 points, got {num_points}")
+
+    # Same group sizes as np.array_split, the first groups take the remainder
+    num_groups = ceil(num_points / 3)
+    sizes = np.full(num_groups, num_points // num_groups, dtype=np.int64)
+    sizes[: num_points % num_groups] += 1
+    starts = np.cumsum(sizes) - sizes
+
+    edges = np.empty((5, num_groups, 6), dtype=edge_topology.INDEX_DTYPE)
+    deactivate = np.zeros((num_groups, 6), dtype=np.bool_)
+    num_edges = np.empty(num_groups, dtype=np.int64)
+    extremes = np.empty((num_groups, 2), dtype=np.int64)
+    _build_base_layer(px, py, starts, sizes, edges, num_edges, extremes)
+
+    primitives = []
+    for g, (start, size) in enumerate(zip(starts.tolist(), sizes.tolist())):
+        triang = edge_topology.TriangulationEdges.from_arrays(
+            px[start : start + size],
+            py[start : start + size],
+            *edges[:, g],
+            deactivate[g],
+            num_edges[g],
+            -1,
+        )
+        triang.set_extreme_edges(*extremes[g].tolist())
+        primitives.append(triang)
+    return primitives
+
+
+# ------------------------ Deprecated group interface -------------------------
+
+
+def _warn_group_api(name):
+    warnings.warn(
+        f"{name} is deprecated, pass the point coordinates to "
+        "make_primitives_np",
+        DeprecationWarning,
+        stacklevel=3,
+    )
 
-# -------------------------------- Definitions --------------------------------
+
+def _group_primitive(pts_subset):
+    points = np.asarray(pts_subset, dtype=np.float64).reshape(-1, 2)
+    return make_primitives_np(points[:, 0], points[:, 1])[0]
 
 
 def line_primitive(pts_subset):
-    """Construct edge and its symmetric, add to TriangulationEdges object.
+    """Construct the triangulation of two points.
 
-    This function takes in a list of two points and forms an edge.
-    The symmetric edge, where the origin and destination points are reversed,
-    is also constructed. These two edge are added into a new TriangulationEdges
-    class object which is returned by the function.
+    Deprecated, use make_primitives_np.
 
     Parameters
     ----------
-    pts_index : list
-        List of the indices of the two points.
     pts_subset : lists of lists
         A set of two points with the form [ [x1, y1], [x2, y2] ].
 
     Returns
     -------
-    left_most_edge : int
-        Index of edge with the left most point.
-    right_most_edge : int
-       Index of the edge with the right most point.
     line : TriangulationEdges
         The resulting triangulation of two points.
     """
-    p1, p2 = 0, 1
-    edge, edge_sym = edge_topology.setup_edge(p1, p2, 0)
-    line = edge_topology.TriangulationEdges(pts_subset)
-    line.push_back(edge)
-    line.push_back(edge_sym)
-
-    left_most_edge = edge.index
-    right_most_edge = line.edges[edge.index].sym
-
-    line.set_extreme_edges(left_most_edge, right_most_edge)
-    return line
+    _warn_group_api("line_primitive")
+    return _group_primitive(pts_subset)
 
 
 def triangle_primitive(pts_subset):
     """Create a triangle from 3 points with CCW orientation.
 
-    This function takes a list of three points and forms three edges to
-    create a single triangle. This triangle has the property that the origin
-    of one edge is connected to the destination of the next edge in a CCW
-    orientation.
+    Deprecated, use make_primitives_np.
 
     Parameters
     ----------
-    pts_index : list
-        List of the indices of the three points.
     pts_subset : lists of lists
         A set of three points with the form [ [x1, y1], [x2, y2] , [x3, y3] ].
 
     Returns
     -------
-    out1 : int
-        Index of edge with the left most point.
-    ou2 : int
-       Index of the edge with the right most point.
     edges : TriangulationEdges
         The resulting triangulation of three points.
     """
-    p1, p2, p3 = 0, 1, 2
-    triang = edge_topology.TriangulationEdges(pts_subset)
-
-    # Create the first two edges of the triangle
-    edge1, edge1_sym = edge_topology.setup_edge(p1, p2, 0)
-    triang.push_back(edge1)
-    triang.push_back(edge1_sym)
-
-    edge2, edge2_sym = edge_topology.setup_edge(p2, p3, 2)
-    triang.push_back(edge2)
-    triang.push_back(edge2_sym)
-
-    triang.splice(edge1_sym.index, edge2.index)
-
-    # To maintain the counter-clockwise orientation of the edges in the
-    # triangle, we determine where p3 is in relation to the two existing edges.
-    pt1 = pts_subset[triang.edges[edge1.index].org]
-    pt2 = pts_subset[triang.edges[edge1.index].dest]
-    pt3 = pts_subset[p3]
-
-    if linalg.on_right(pt1, pt2, pt3):
-        # Points are in CCW orientiaton
-        c = triang.connect(edge2.index, edge1.index)
-        triang.set_extreme_edges(edge1.index, edge2_sym.index)
-        return triang
-
-    if linalg.on_left(pt1, pt2, pt3):
-        # Points are in CW orientiaton
-        c = triang.connect(edge2.index, edge1.index)
-        triang.set_extreme_edges(triang.edges[c].sym, c)
-        return triang
-
-    # Points are collinear
-    triang.set_extreme_edges(edge1.index, edge2_sym.index)
-    return triang
+    _warn_group_api("triangle_primitive")
+    return _group_primitive(pts_subset)
 
 
 def make_primitives(split_pts):
     """Create a list of geometric primitives from a list of sets of points.
 
+    Deprecated, use make_primitives_np.
+
     Parameters
     ----------
     split_pts : list of list of tuple
-        List of sets of x-y coordinates for points.
+        List of sets of x-y coordinates for points. Each set holds 2 or 3
+        points.
 
     Returns
     -------
-    list of Primitive
-        List of geometric primitives. Each primitive is either a LinePrimitive
-        or a TrianglePrimitive object.
-
-    Raises
-    ------
-    Exception
-        If a set of points contains no points.
+    list of TriangulationEdges
+        List of the line and triangle primitives of each set of points.
     """
-    primitives = []
-    for pts_subset in split_pts:
-        if len(pts_subset) == 2:
-            # 2 points define a single edge
-            primitives.append(line_primitive(pts_subset))
-        elif len(pts_subset) == 3:
-            # 3 points define a single triangle
-            primitives.append(triangle_primitive(pts_subset))
-        elif len(pts_subset) == 0:
-            raise Exception("Unexpected number of points in pts_subset")
-    return primitives
+    _warn_group_api("make_primitives")
+    return [_group_primitive(pts_subset) for pts_subset in split_pts]
@@ -0,0 +1,35 @@
+"""Script that compiles the Numba kernels into the on-disk cache.
+
+The Numba kernels are compiled with 'cache=True', so the compiled machine code
+is stored next to the modules, or in the directory given by the environment
+variable NUMBA_CACHE_DIR, and loaded by later runs instead of being compiled
+again. Running this script once after installation, e.g. when building a
+container image, moves the compilation cost out of the first triangulation.
+
+Run this using the following command format:
+    `NUMBA_CACHE_DIR=<cache directory> python precompile_kernels.py`
+"""
+
+import time
+
+import numpy as np
+
+from paralleldelaunay.triangulation_core.linear_algebra import (
+    lexicographic_sort_np,
+)
+from paralleldelaunay.triangulation_core.triangulation import triangulate
+
+# -----------------------------------------------------------------------------
+
+start = time.time()
+
+# Triangulating a small point set calls every kernel with the argument types
+# used for any input size. The collinear points exercise the primitives with
+# degenerate orientation.
+px = np.array([0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 0.5, 2.5, 4.5, 1.5, 3.5, 5.5])
+py = np.array([0.0, 1.0, 2.0, 0.0, 0.0, 0.0, 3.0, 2.0, 3.0, 4.0, 5.0, 4.0])
+px, py = lexicographic_sort_np(px, py)
+triangulation = triangulate(np.column_stack((px, py)))
+
+elapsed = time.time() - start
+print(f"Compiled kernels in {elapsed*1000:0.1f} ms")
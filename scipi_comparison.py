@@ -2,11 +2,12 @@
 
 import time
 
+import numpy as np
 from scipy.spatial import Delaunay
 
 import paralleldelaunay.triangulation_core.points_tools.generate_values as generate_values
 from paralleldelaunay.triangulation_core.linear_algebra import (
-    lexicographic_sort,
+    lexicographic_sort_np,
 )
 from paralleldelaunay.triangulation_core.triangulation import triangulate
 from paralleldelaunay.utilities.settings import World
@@ -18,10 +19,11 @@ world_size = [0, 1000, 0, 1000]
 world = World(world_size)
 
 num_points = 1000
-positions = generate_values.random(num_points, world)
+px, py = generate_values.random(num_points, world)
 
 start = time.time()
-positions = lexicographic_sort(positions)
+px, py = lexicographic_sort_np(px, py)
+positions = np.column_stack((px, py))
 triangulation = triangulate(positions)
 elapsed1 = time.time() - start
 print(f"vhill: {num_points} points in {elapsed1*1000:0.1f} ms")
@@ -0,0 +1,185 @@
+"""Tests of the adaptive precision predicates against exact arithmetic.
+
+The reference signs are computed with 'fractions.Fraction', which represents
+every float64 exactly, so the determinants are evaluated without rounding.
+Most of the cases are chosen so that the floating-point filter of the
+predicates cannot decide the sign and the exact fallback is used.
+"""
+
+from fractions import Fraction
+from itertools import combinations, product
+
+import numpy as np
+import pytest
+
+import paralleldelaunay.triangulation_core.linear_algebra as linalg
+from paralleldelaunay.triangulation_core.robust_predicates import (
+    incircle,
+    orient2d,
+)
+
+# ------------------------------ Exact references -----------------------------
+
+
+def sign(value):
+    """Return the sign of a number as -1, 0 or 1."""
+    return int(value > 0) - int(value < 0)
+
+
+def exact_orient2d(ax, ay, bx, by, cx, cy):
+    """Return the exact orientation determinant of three points."""
+    ax, ay, bx, by, cx, cy = map(Fraction, (ax, ay, bx, by, cx, cy))
+    return (ax - cx) * (by - cy) - (ay - cy) * (bx - cx)
+
+
+def exact_incircle(ax, ay, bx, by, cx, cy, dx, dy):
+    """Return the exact in-circle determinant of four points."""
+    ax, ay, bx, by, cx, cy, dx, dy = map(
+        Fraction, (ax, ay, bx, by, cx, cy, dx, dy)
+    )
+    adx, ady = ax - dx, ay - dy
+    bdx, bdy = bx - dx, by - dy
+    cdx, cdy = cx - dx, cy - dy
+    return (
+        (adx * adx + ady * ady) * (bdx * cdy - cdx * bdy)
+        + (bdx * bdx + bdy * bdy) * (cdx * ady - adx * cdy)
+        + (cdx * cdx + cdy * cdy) * (adx * bdy - bdx * ady)
+    )
+
+
+def ulp_grid(x, y, steps=8):
+    """Return the points within 'steps' ulps of the point (x, y)."""
+    xs = [x]
+    ys = [y]
+    for _ in range(steps):
+        xs.append(np.nextafter(xs[-1], np.inf))
+        ys.append(np.nextafter(ys[-1], np.inf))
+    return [(float(px), float(py)) for px, py in product(xs, ys)]
+
+
+# -------------------------------- orient2d -----------------------------------
+
+
+def test_orient2d_exactly_collinear():
+    """Collinear points with exactly representable coordinates give 0."""
+    cases = [
+        (0.0, 0.0, 1.0, 1.0, 2.0, 2.0),
+        (-3.5, 1.0, 0.5, 1.0, 1e10, 1.0),
+        (1.0, 2.0, 1.0, 2.0, 5.0, -7.0),
+    ]
+    for coords in cases:
+        assert orient2d(*coords) == 0.0, f"not collinear: {coords}"
+
+
+def test_orient2d_orientation():
+    """Counterclockwise points are positive and clockwise points negative."""
+    ccw = orient2d(0.0, 0.0, 1.0, 0.0, 0.0, 1.0)
+    cw = orient2d(0.0, 0.0, 0.0, 1.0, 1.0, 0.0)
+    assert ccw > 0, f"ccw points gave {ccw}"
+    assert cw < 0, f"cw points gave {cw}"
+
+
+def test_orient2d_rounded_collinear():
+    """Points on y = x whose decimal coordinates are rounded."""
+    for a, b, c in combinations([0.1, 0.2, 0.3, 0.7, 1.1, 3.3], 3):
+        expected = sign(exact_orient2d(a, a, b, b, c, c))
+        actual = sign(orient2d(a, a, b, b, c, c))
+        assert actual == expected, f"wrong sign for {(a, b, c)}"
+
+
+def test_orient2d_near_collinear_grid():
+    """Points within a few ulps of a line through two distant points.
+
+    This is the classic failure case of the naive determinant: the computed
+    sign is wrong for a large part of the grid around (0.5, 0.5).
+    """
+    for px, py in ulp_grid(0.5, 0.5):
+        expected = sign(exact_orient2d(px, py, 12.0, 12.0, 24.0, 24.0))
+        actual = sign(orient2d(px, py, 12.0, 12.0, 24.0, 24.0))
+        assert actual == expected, f"wrong sign at {(px, py)}"
+
+
+def test_orient2d_random():
+    """Random points agree with the exact determinant."""
+    rng = np.random.default_rng(3)
+    for coords in rng.uniform(-1000, 1000, (200, 6)):
+        coords = coords.tolist()
+        expected = sign(exact_orient2d(*coords))
+        assert sign(orient2d(*coords)) == expected, f"wrong sign: {coords}"
+
+
+# -------------------------------- incircle -----------------------------------
+
+# Integer points on the circle x**2 + y**2 = 25
+CIRCLE_25 = [(5, 0), (4, 3), (3, 4), (0, 5), (-3, 4), (-5, 0), (4, -3)]
+
+
+def test_incircle_cocircular_lattice():
+    """Four integer points on a common circle give exactly 0."""
+    for a, b, c, d in combinations(CIRCLE_25, 4):
+        coords = [float(v) for point in (a, b, c, d) for v in point]
+        assert incircle(*coords) == 0.0, f"not cocircular: {coords}"
+
+
+def test_incircle_orientation():
+    """The sign is positive inside a ccw circle and reversed for cw."""
+    inside = incircle(1.0, 0.0, 0.0, 1.0, -1.0, 0.0, 0.0, 0.0)
+    outside = incircle(1.0, 0.0, 0.0, 1.0, -1.0, 0.0, 0.0, 2.0)
+    inside_cw = incircle(-1.0, 0.0, 0.0, 1.0, 1.0, 0.0, 0.0, 0.0)
+    assert inside > 0, f"point inside a ccw circle gave {inside}"
+    assert outside < 0, f"point outside a ccw circle gave {outside}"
+    assert inside_cw < 0, f"point inside a cw circle gave {inside_cw}"
+
+
+@pytest.mark.parametrize("scale", [1.0, 1e-3, 1e8])
+def test_incircle_near_cocircular(scale):
+    """Points within a few ulps of a circle through three lattice points."""
+    a, b, c = [(x * scale, y * scale) for x, y in CIRCLE_25[:3]]
+    dx, dy = CIRCLE_25[4][0] * scale, CIRCLE_25[4][1] * scale
+    for px, py in ulp_grid(dx, dy, steps=4):
+        expected = sign(exact_incircle(*a, *b, *c, px, py))
+        actual = sign(incircle(*a, *b, *c, px, py))
+        assert actual == expected, f"wrong sign at {(px, py)}"
+
+
+def test_incircle_translated_cocircular():
+    """Cocircular points far from the origin, where rounding is large."""
+    offset = 1e6 + 0.1
+    points = [(x + offset, y + offset) for x, y in CIRCLE_25]
+    for a, b, c, d in combinations(points, 4):
+        coords = [v for point in (a, b, c, d) for v in point]
+        expected = sign(exact_incircle(*coords))
+        assert sign(incircle(*coords)) == expected, f"wrong sign: {coords}"
+
+
+def test_incircle_random():
+    """Random points agree with the exact determinant."""
+    rng = np.random.default_rng(5)
+    for coords in rng.uniform(-1000, 1000, (200, 8)):
+        coords = coords.tolist()
+        expected = sign(exact_incircle(*coords))
+        assert sign(incircle(*coords)) == expected, f"wrong sign: {coords}"
+
+
+# ---------------------------- Derived predicates -----------------------------
+
+
+def test_in_circle_sign_matches_exact():
+    """in_circle_sign is 1 inside, -1 outside and 0 on the circle."""
+    a, b, c = [(float(x), float(y)) for x, y in CIRCLE_25[:3]]
+    for px, py in ulp_grid(-3.0, 4.0, steps=3):
+        expected = -sign(exact_incircle(*a, *b, *c, px, py))
+        actual = linalg.in_circle_sign(*a, *b, *c, px, py)
+        assert actual == expected, f"wrong sign at {(px, py)}"
+        inside = linalg.in_circle(*a, *b, *c, px, py)
+        assert inside == (expected == 1), f"wrong in_circle at {(px, py)}"
+
+
+def test_ccw_angle_side_tests():
+    """on_right and on_left follow the exact sign of the orientation."""
+    for px, py in ulp_grid(0.5, 0.5, steps=4):
+        expected = sign(exact_orient2d(12.0, 12.0, 24.0, 24.0, px, py))
+        right = linalg.on_right(12.0, 12.0, 24.0, 24.0, px, py)
+        left = linalg.on_left(12.0, 12.0, 24.0, 24.0, px, py)
+        assert right == (expected > 0), f"wrong on_right at {(px, py)}"
+        assert left == (expected < 0), f"wrong on_left at {(px, py)}"
@@ -0,0 +1,222 @@
+"""Tests of the triangulation and of the edge arrays of its result."""
+
+import numpy as np
+import pytest
+from scipy.spatial import Delaunay
+
+from paralleldelaunay.triangulation_core.linear_algebra import (
+    lexicographic_sort,
+)
+from paralleldelaunay.triangulation_core.triangulation import (
+    combine_triangulations,
+    lowest_common_tangent,
+    merge_all,
+    merge_two,
+    recursive_group_merge,
+    triangulate,
+    zip_hulls,
+)
+from paralleldelaunay.triangulation_core.triangulation_primitives import (
+    make_primitives,
+    make_primitives_np,
+)
+
+# --------------------------------- Helpers -----------------------------------
+
+
+def random_points(num, seed=0):
+    """Return 'num' random points in lexicographic order."""
+    rng = np.random.default_rng(seed)
+    return lexicographic_sort(rng.uniform(0, 1000, (num, 2)))
+
+
+def active_edges(triangulation):
+    """Return the set of undirected edges which are not deactivated."""
+    num = triangulation.num_edges
+    keep = ~triangulation.deactivate[:num]
+    org = triangulation.org[:num][keep]
+    dest = triangulation.dest[:num][keep]
+    return {
+        (min(o, d), max(o, d)) for o, d in zip(org.tolist(), dest.tolist())
+    }
+
+
+def scipy_edges(points):
+    """Return the set of undirected edges of SciPy's Delaunay triangulation."""
+    edges = set()
+    for simplex in Delaunay(points).simplices.tolist():
+        for i, j in ((0, 1), (1, 2), (0, 2)):
+            a, b = simplex[i], simplex[j]
+            edges.add((min(a, b), max(a, b)))
+    return edges
+
+
+def onext_ring(triangulation, e):
+    """Return the destinations of the ring of edges around the origin of e."""
+    ring = []
+    edge = e
+    while True:
+        ring.append(int(triangulation.dest[edge]))
+        edge = int(triangulation.onext[edge])
+        if edge == e:
+            return ring
+
+
+def check_topology(triangulation):
+    """Check that the sym, onext and oprev links are consistent."""
+    num = triangulation.num_edges
+    idx = np.arange(num)
+    org, dest = triangulation.org[:num], triangulation.dest[:num]
+    sym = triangulation.sym[:num]
+    onext, oprev = triangulation.onext[:num], triangulation.oprev[:num]
+    assert np.array_equal(sym[sym], idx), "sym is not an involution"
+    assert np.array_equal(org[sym], dest), "sym does not reverse the edge"
+    assert np.array_equal(org[onext], org), "onext leaves the origin ring"
+    assert np.array_equal(onext[oprev], idx), "oprev does not invert onext"
+
+
+# ------------------------------- Triangulation -------------------------------
+
+
+@pytest.mark.parametrize("num", [2, 3, 4, 5, 17, 1000])
+def test_matches_scipy(num):
+    """The edges are those of SciPy's Delaunay triangulation."""
+    points = random_points(num, seed=num)
+    triangulation = triangulate(points)
+    deactivated = triangulation.deactivate[: triangulation.num_edges]
+    assert not deactivated.any(), "the result holds deactivated edges"
+    expected = {(0, 1)} if num == 2 else scipy_edges(points)
+    assert active_edges(triangulation) == expected, "edges differ from SciPy"
+
+
+def test_collinear_points():
+    """Collinear points are joined into a chain of edges."""
+    points = np.column_stack((np.arange(10.0), 2.0 * np.arange(10.0)))
+    triangulation = triangulate(points)
+    expected = {(i, i + 1) for i in range(9)}
+    assert active_edges(triangulation) == expected, "not a chain of edges"
+
+
+def test_too_few_points():
+    """A single point cannot be triangulated."""
+    with pytest.raises(ValueError, match="got 1"):
+        triangulate(np.array([[0.0, 0.0]]))
+
+
+def test_threads_match_sequential():
+    """Merging on a thread pool gives the same triangulation."""
+    points = random_points(2000, seed=1)
+    sequential = triangulate(points)
+    threaded = triangulate(points, processes=2, threads=True)
+    expected = active_edges(sequential)
+    assert active_edges(threaded) == expected, "threaded merge differs"
+
+
+# ------------------------------ Reference merge ------------------------------
+
+
+def test_reference_merge():
+    """The step by step merge gives the same triangulation as merge_two."""
+    points = random_points(200, seed=9)
+    primitives = make_primitives_np(points[:, 0], points[:, 1])
+    half = len(primitives) // 2
+    left = merge_all(primitives[:half])
+    right = merge_all(primitives[half:])
+    expected = merge_two(left, right)
+
+    ldi, rdi = lowest_common_tangent(left, right)
+    base, edges = combine_triangulations(ldi, rdi, left, right)
+    merged = zip_hulls(base, edges)
+
+    assert active_edges(merged) == active_edges(expected), "edges differ"
+    check_topology(merged)
+    extremes = (merged.inner, merged.outer)
+    assert extremes == (expected.inner, expected.outer), "extremes differ"
+
+
+# ------------------------------ Edge clean up --------------------------------
+
+
+def test_filter_deactivated():
+    """Removing the deactivated edges keeps the other edges and their links."""
+    points = random_points(500, seed=2)
+    triangulation = triangulate(points)
+    extremes = {triangulation.inner, triangulation.outer}
+    extremes |= {int(triangulation.sym[e]) for e in extremes}
+    killed = list(range(0, triangulation.num_edges, 14))
+    killed = [e for e in killed if not extremes & {e, e + 1}]
+    for e in killed:
+        triangulation.kill_edge(e)
+    remaining = active_edges(triangulation)
+    inner = triangulation.org[triangulation.inner]
+    outer = triangulation.org[triangulation.outer]
+
+    triangulation.filter_deactivated()
+
+    assert not triangulation.deactivate.any(), "deactivated edges are left"
+    assert triangulation.num_edges == 2 * len(remaining), "wrong edge count"
+    assert active_edges(triangulation) == remaining, "active edges changed"
+    check_topology(triangulation)
+    assert triangulation.org[triangulation.inner] == inner, "inner moved"
+    assert triangulation.org[triangulation.outer] == outer, "outer moved"
+
+
+# -------------------------------- Adjacency ----------------------------------
+
+
+def test_build_csr():
+    """The CSR adjacency lists the ring of neighbours of every point."""
+    points = random_points(300, seed=4)
+    triangulation = triangulate(points)
+    indptr, neighbours = triangulation.build_csr()
+
+    assert len(indptr) == len(points) + 1, "indptr has the wrong length"
+    assert indptr[-1] == triangulation.num_edges, "not every edge is listed"
+    first_edge = {}
+    for e in range(triangulation.num_edges):
+        first_edge.setdefault(int(triangulation.org[e]), e)
+    for v, e in first_edge.items():
+        ring = onext_ring(triangulation, e)
+        csr = neighbours[indptr[v] : indptr[v + 1]].tolist()
+        assert sorted(csr) == sorted(ring), f"wrong neighbours of point {v}"
+        # Both walk the same ccw ring, possibly from different edges
+        start = csr.index(ring[0])
+        assert csr[start:] + csr[:start] == ring, f"wrong ring of point {v}"
+
+
+def test_iter_neighbours():
+    """iter_neighbours walks the onext ring around the origin of an edge."""
+    points = random_points(300, seed=6)
+    triangulation = triangulate(points)
+    for e in range(0, triangulation.num_edges, 7):
+        org = int(triangulation.org[e])
+        walk = list(triangulation.iter_neighbours(e))
+        expected = [(org, dest) for dest in onext_ring(triangulation, e)]
+        assert walk == expected, f"wrong ring around edge {e}"
+
+
+# ---------------------------- Deprecated interface ---------------------------
+
+
+def test_deprecated_group_merge():
+    """The nested-group merge warns and gives the same triangulation."""
+    points = random_points(100, seed=7)
+    primitives = make_primitives_np(points[:, 0], points[:, 1])
+    groups = [primitives[i : i + 2] for i in range(0, len(primitives), 2)]
+    with pytest.warns(DeprecationWarning):
+        merged = recursive_group_merge(groups)[0][0]
+    expected = active_edges(merge_all(primitives))
+    assert active_edges(merged) == expected, "nested-group merge differs"
+
+
+def test_deprecated_primitives():
+    """The per-group primitives warn and match the base layer."""
+    points = random_points(8, seed=8)
+    groups = [points[0:3], points[3:6], points[6:8]]
+    with pytest.warns(DeprecationWarning):
+        primitives = make_primitives(groups)
+    expected = make_primitives_np(points[:, 0], points[:, 1])
+    for old, new in zip(primitives, expected):
+        assert active_edges(old) == active_edges(new), "edges differ"
+        extremes = (old.inner, old.outer)
+        assert extremes == (new.inner, new.outer), "extreme edges differ"
